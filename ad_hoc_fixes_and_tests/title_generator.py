@@ -1,55 +1,135 @@
 import random
+import bisect
+import functools
+import itertools
+from typing import Final
 
-# Word banks for constructing song names
-adjectives = [
+# Word banks for constructing song names, tuples since they never change
+adjectives: Final = (
     "Cozy", "Gentle", "Warm", "Dreamy", "Soft", "Quiet", "Easy", "Calm", "Sunny", "Mellow",
     "Soothing", "Breezy", "Lazy", "Peaceful", "Golden", "Tranquil", "Chill", "Fading",
     "Hazy", "Serene", "Blissful", "Uplifting", "Hopeful", "Bright", "Velvet", "Drowsy",
     "Faint", "Shimmering", "Luminous", "Wistful", "Playful", "Cheerful", "Pastel", "Frosted",
-    "Evening", "Morning", "Midnight", "Twilight", "Crimson", "Azure", "Ivory", "Amber"
-]
+    "Crimson", "Azure", "Ivory", "Amber"
+)  # "Morning", "Evening", "Midnight" and "Twilight" are in time_words only, so no title can be made twice
 
-time_words = [
+time_words: Final = (
     "Morning", "Noon", "Midnight", "Twilight", "Sunrise", "Sunset", "Dawn", "Dusk",
     "Nightfall", "Daybreak", "Golden Hour", "Evening", "Late Night", "Afternoon", "First Light"
-]
+)
 
-nature_words = [
+nature_words: Final = (
     "Breeze", "Rain", "Sunlight", "Sky", "Clouds", "Mist", "Waves", "Forest", "Leaves",
     "River", "Mountains", "Shore", "Sea", "Valley", "Horizon", "Moonlight", "Starlight",
     "Fog", "Petals", "Snow", "Wind", "Meadow", "Garden", "Ocean", "Stream", "Fields", "Branches"
-]
+)
 
-cozy_nouns = [
+cozy_nouns: Final = (
     "Cafe", "Dream", "Glow", "Haze", "Drift", "Flow", "Rhythm", "Melody", "Harmony", "Serenade",
     "Echo", "Whisper", "Loop", "Groove", "Stroll", "Lounge", "Room", "Corner", "Window", "Light",
     "Steps", "Shadows", "Reflections", "Chapters", "Pages", "Stories", "Letters", "Moments", "Frames"
-]
+)
+
+places: Final = ("the City", "the Garden", "the Cafe", "the Valley", "the Forest", "the Rain")
+
+def _choice(bank, getrandbits=random.getrandbits):
+    """
+    random.choice without its rejection loop, 32 random bits are scaled to the bank size with
+    one multiply and shift (Lemire). The bias this leaves is under 1 in 10**6 for these sizes.
+    """
+    return bank[(getrandbits(32) * len(bank)) >> 32]
+
+# Title patterns as (first bank, separator, second bank)
+_PATTERN_PARTS = (
+    (adjectives, " ", cozy_nouns),
+    (cozy_nouns, " of ", nature_words),
+    (time_words, " ", cozy_nouns),
+    (adjectives, " ", nature_words),
+    (nature_words, " and ", cozy_nouns),
+    (adjectives, " ", time_words),
+    (time_words, " in ", places),
+)
+
+# First words with the separator already on, e.g. "Cozy " or "Cafe of ", so building a title
+# is one concatenation (one new string) instead of two
+_PATTERN_HEADS = tuple(tuple(word + sep for word in first) for first, sep, _ in _PATTERN_PARTS)
+
+# One builder per title pattern, the banks and _choice are bound as defaults so each call
+# is just the two choices and the concatenation (no format string parsing or kwargs dict)
+_PATTERNS = tuple(
+    lambda rc=_choice, heads=heads, second=second: rc(heads) + rc(second)
+    for heads, (_, _, second) in zip(_PATTERN_HEADS, _PATTERN_PARTS)
+)
+
+# Number of different titles each pattern can make, patterns are picked in proportion so
+# every title is equally likely
+_PATTERN_SIZES = tuple(len(first) * len(second) for first, _, second in _PATTERN_PARTS)
+_CUM_PATTERN_SIZES = tuple(itertools.accumulate(_PATTERN_SIZES))
+_PATTERN_STARTS = (0,) + _CUM_PATTERN_SIZES[:-1]
+_TOTAL_TITLES = _CUM_PATTERN_SIZES[-1]
+
+# Patterns this small have their keys dealt from a shuffled list, random draws from them
+# would mostly repeat titles that were already picked
+_ENUMERATE_BELOW = 500
+_DEALT_PATTERNS = tuple(pattern for pattern, size in enumerate(_PATTERN_SIZES) if size < _ENUMERATE_BELOW)
 
 # Function to generate a title
 def generate_title():
-    pattern = random.choice([
-        "{adj} {noun}",
-        "{noun} of {nature}",
-        "{time} {noun}",
-        "{adj} {nature}",
-        "{nature} and {noun}",
-        "{adj} {time}",
-        "{time} in {place}"
-    ])
-    place = random.choice(["the City", "the Garden", "the Cafe", "the Valley", "the Forest", "the Rain"])
-    return pattern.format(
-        adj=random.choice(adjectives),
-        time=random.choice(time_words),
-        nature=random.choice(nature_words),
-        noun=random.choice(cozy_nouns),
-        place=place
-    )
-
-# Generate 1000 unique titles
-titles = set()
-while len(titles) < 1000:
-    titles.add(generate_title())
-
-titles_list = list(titles)
-print(titles_list[0:100])
\ No newline at end of file
+    key = (random.getrandbits(32) * _TOTAL_TITLES) >> 32
+    return _PATTERNS[bisect.bisect_right(_CUM_PATTERN_SIZES, key)]()
+
+def _title(key):
+    """Title for a key, keys number every title of every pattern from 0 to _TOTAL_TITLES - 1"""
+    pattern = bisect.bisect_right(_CUM_PATTERN_SIZES, key)
+    second = _PATTERN_PARTS[pattern][2]
+    i, j = divmod(key - _PATTERN_STARTS[pattern], len(second))
+    return _PATTERN_HEADS[pattern][i] + second[j]
+
+def _expected_draws(have, want):
+    """Draws needed on average to go from `have` to `want` unique titles (coupon collector)"""
+    return sum(_TOTAL_TITLES / (_TOTAL_TITLES - k) for k in range(have, want))
+
+def generate_titles(count):
+    """
+    Generate `count` unique titles
+    
+    Titles are drawn as integer keys (see _title), a whole batch at a time the same way as _choice,
+    and repeats are dropped from the keys before any strings are built. The batch is sized from
+    the expected number of draws plus 10%, so one batch almost always does. Keys of the small
+    patterns in _DEALT_PATTERNS are dealt without repeats instead.
+    """
+    if count > _TOTAL_TITLES:
+        raise ValueError(f"Only {_TOTAL_TITLES} different titles are possible, asked for {count}")
+    
+    getrandbits = random.getrandbits
+    keys = set()
+    titles = []
+    unused = {
+        pattern: iter(random.sample(range(_PATTERN_STARTS[pattern], _CUM_PATTERN_SIZES[pattern]), _PATTERN_SIZES[pattern]))
+        for pattern in _DEALT_PATTERNS
+    }
+    while len(titles) < count:
+        batch_size = int(_expected_draws(len(titles), count) * 1.1) + 1
+        drawn = [(getrandbits(32) * _TOTAL_TITLES) >> 32 for _ in range(batch_size)]
+        # Keys that land in a dealt pattern are swapped for its next unused key (None once it runs out)
+        patterns = map(bisect.bisect_right, itertools.repeat(_CUM_PATTERN_SIZES), drawn)
+        drawn = [next(unused[pattern], None) if pattern in unused else key for key, pattern in zip(drawn, patterns)]
+        
+        # dict.fromkeys drops the repeats within the batch in one pass and keeps the draw order,
+        # then only keys from earlier batches need checking
+        fresh = [key for key in dict.fromkeys(drawn) if key is not None and key not in keys][:count - len(titles)]
+        keys.update(fresh)
+        titles.extend(map(_title, fresh))  # every key makes a different title
+    return titles
+
+@functools.lru_cache(maxsize=1)
+def get_titles(count=1000):
+    """
+    `count` unique titles as a tuple, generated on first use and reused after that
+    
+    Use random.sample(get_titles(), k) for a few of them.
+    """
+    return tuple(generate_titles(count))
+
+if __name__ == "__main__":
+    print(list(get_titles())[0:100])
@@ -5,73 +5,141 @@ Requires ffmpeg to be installed on the system
 """
 
 import os
-import glob
-import subprocess
+import re
+import functools
+import sys
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
+from ffmpeg_runner import FFMPEG, FFPROBE, run_ffmpeg, run_probe, print_ffmpeg_missing
+
+# Encoder settings for the stitched mix. VBR V2 (~190kbps) sounds the same as 320k CBR for this
+# material, and compression_level is LAME's algorithm quality (0 = slowest, 9 = fastest, LAME
+# defaults to 3), so 5 takes a good share of the CPU off the encode
+MP3_VBR_ARGS = ['-c:a', 'libmp3lame', '-q:a', '2', '-compression_level', '5']
+MP3_320K_ARGS = ['-c:a', 'libmp3lame', '-b:a', '320k']
+
+# Single-pass EBU R128 normalization to YouTube's -14 LUFS target, cheaper than dynaudnorm's
+# look-ahead window. loudnorm processes at 192kHz internally, so resample back for the encoder
+LOUDNORM_FILTER = 'loudnorm=I=-14:TP=-1:LRA=11,aresample=44100'
+
+AUDIO_EXTENSIONS = {'.mp3', '.wav', '.m4a', '.flac', '.aac'}
+
+# Underscore separated parts of API filenames that are not part of the title
+_TITLE_STRIP_RE = re.compile(r'(?:^|_)(?:table|audio|lofi|\d+)(?=_|$)')
 
 def get_audio_duration(file_path):
-    """Get duration of audio file using ffprobe"""
+    """Get duration of audio file using ffprobe (cached per absolute path and mtime)"""
+    abs_path = os.path.abspath(file_path)
+    try:
+        mtime = os.path.getmtime(abs_path)
+    except OSError:
+        return 0
+    return _probe_duration(abs_path, mtime)
+
+@functools.lru_cache(maxsize=None)
+def _probe_duration(abs_path, mtime):
+    """Run ffprobe once per file version, a file rewritten in place gets probed again"""
+    if not FFPROBE:
+        return 0
     try:
         cmd = [
-            'ffprobe', '-v', 'quiet', '-show_entries', 'format=duration',
-            '-of', 'csv=p=0', file_path
+            FFPROBE, '-v', 'quiet', '-show_entries', 'format=duration',
+            '-of', 'csv=p=0', abs_path
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_probe(cmd)
         return float(result.stdout.strip())
     except:
         return 0
 
+def get_audio_stream_info(file_path):
+    """Get (codec, sample rate, channels) of the first audio stream, None if it can't be probed (cached per path and mtime)"""
+    abs_path = os.path.abspath(file_path)
+    try:
+        mtime = os.path.getmtime(abs_path)
+    except OSError:
+        return None
+    return _probe_stream_info(abs_path, mtime)
+
+@functools.lru_cache(maxsize=None)
+def _probe_stream_info(abs_path, mtime):
+    """Run ffprobe once per file version, like _probe_duration"""
+    if not FFPROBE:
+        return None
+    try:
+        cmd = [
+            FFPROBE, '-v', 'quiet', '-select_streams', 'a:0',
+            '-show_entries', 'stream=codec_name,sample_rate,channels',
+            '-of', 'csv=p=0', abs_path
+        ]
+        result = run_probe(cmd)
+        info = result.stdout.strip()
+        if result.returncode != 0 or not info:
+            return None
+        return tuple(info.split(','))
+    except:
+        return None
+
+def _probe_many(probe, file_paths):
+    """Run probe over many files at once, returns {path: result}"""
+    # ffprobe runs are pure subprocess waits, so threads overlap them fine
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as executor:
+        results = list(executor.map(probe, file_paths))
+    return dict(zip(file_paths, results))
+
+def get_audio_durations(file_paths):
+    """Probe durations for many files at once, returns {path: duration}"""
+    return _probe_many(get_audio_duration, file_paths)
+
+def get_audio_stream_infos(file_paths):
+    """Probe stream info for many files at once, returns {path: (codec, sample rate, channels) or None}"""
+    return _probe_many(get_audio_stream_info, file_paths)
+
+def tracklist_path(output_file):
+    """Where the tracklist for a stitched mix goes, <mix name>_tracklist.txt next to it"""
+    output_path = Path(output_file)
+    return str(output_path.with_name(f"{output_path.stem}_tracklist.txt"))
+
 def format_timestamp(seconds):
     """Format seconds into MM:SS or HH:MM:SS timestamp format"""
-    if seconds >= 3600:  # 1 hour or more
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        return f"{hours}:{minutes:02d}:{secs:02d}"
-    else:
-        minutes = int(seconds // 60)
-        secs = int(seconds % 60)
-        return f"{minutes:02d}:{secs:02d}"
+    hours, rest = divmod(int(seconds), 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
 
 def extract_song_title(filename):
     """Extract clean song title from filename, relevant for api connection"""
-    # Remove file extension
-    name = os.path.splitext(os.path.basename(filename))[0]
+    # Remove directory and file extension
+    name = Path(filename).stem
     
     # Try to remove common prefixes like timestamps and "table_audio_lofi_"
     if "table_audio_lofi_" in name:
-        # Split by underscore and try to find the actual title
-        parts = name.split("_")
-        # Look for parts that aren't timestamps or common prefixes
-        title_parts = []
-        skip_next = False
-        for i, part in enumerate(parts):
-            if skip_next:
-                skip_next = False
-                continue
-            if part in ["table", "audio", "lofi"] or part.isdigit() or (len(part) == 6 and part.isdigit()):
-                continue
-            if len(part) == 8 and part.isdigit():  # Date format YYYYMMDD
-                continue
-            if len(part) == 6 and part.isdigit():  # Time format HHMMSS
-                continue
-            title_parts.append(part)
-        
-        if title_parts:
-            return " ".join(title_parts).replace("_", " ").title()
+        # Drop the prefix words and all-digit parts (dates, times), keep the actual title
+        title = _TITLE_STRIP_RE.sub('', name).strip('_')
+        if title:
+            return title.replace("_", " ").title()
     
     # If no special processing needed, just clean up the filename
     return name.replace("_", " ").title()
 
-def calculate_timestamps(audio_files, fade_duration, silence_duration=0, producer_tag=None):
-    """Calculate when each song starts in the final mix"""
+def calculate_timestamps(audio_files, fade_duration, silence_duration=0, producer_tag=None, durations=None):
+    """
+    Calculate when each song starts in the final mix (durations: optional {path: seconds} from get_audio_durations)
+    
+    Returns (timestamps, total_duration), total_duration being where the last song ends
+    """
     timestamps = []
     current_time = 0.0
     
+    has_producer_tag = producer_tag and os.path.exists(producer_tag)
+    
+    # Probe every file up front instead of one ffprobe at a time
+    if durations is None:
+        durations = get_audio_durations(([producer_tag] if has_producer_tag else []) + list(audio_files))
+    
     # Account for producer tag duration if provided
-    if producer_tag and os.path.exists(producer_tag):
-        producer_duration = get_audio_duration(producer_tag)
+    if has_producer_tag:
+        producer_duration = durations[producer_tag]
         current_time = producer_duration
         
         # Add producer tag to timestamps
@@ -83,7 +151,7 @@ def calculate_timestamps(audio_files, fade_duration, silence_duration=0, produce
         })
     
     for i, audio_file in enumerate(audio_files):
-        duration = get_audio_duration(audio_file)
+        duration = durations[audio_file]
         title = extract_song_title(audio_file)
         
         timestamps.append({
@@ -100,9 +168,54 @@ def calculate_timestamps(audio_files, fade_duration, silence_duration=0, produce
             # Subsequent songs: fade overlap + remaining duration + silence
             current_time += duration - fade_duration + silence_duration
     
-    return timestamps
+    total_duration = timestamps[-1]['start_time'] + timestamps[-1]['duration'] if timestamps else 0.0
+    return timestamps, total_duration
 
-def stitch_audio_files(playlist_title, input_folder="songs", output_file=None, fade_duration=5, silence_duration=0, producer_tag=None):
+def build_mix_filter(audio_files, durations, fade_duration, silence_duration=0, producer_tag=None):
+    """
+    Build a filter graph that crossfades audio_files in a single pass
+    
+    Each input gets its own fade in/out and is delayed to its start time, then everything is
+    mixed at once. Unlike chained acrossfades the work stays linear in the number of files,
+    and the start times match calculate_timestamps. The producer tag, if given, is input [0]
+    and plays untouched before the first song.
+    """
+    filter_parts = []
+    stream_refs = []
+    current_time = 0.0
+    input_offset = 0
+    last_index = len(audio_files) - 1
+    
+    if producer_tag:
+        stream_refs.append('[0]')
+        current_time = durations[producer_tag]
+        input_offset = 1  # +1 because producer tag is input [0]
+    
+    for i, audio_file in enumerate(audio_files):
+        duration = durations[audio_file]
+        filters = []
+        
+        if fade_duration > 0:
+            if i > 0:
+                filters.append(f'afade=t=in:st=0:d={fade_duration}')
+            if i < last_index:
+                filters.append(f'afade=t=out:st={max(duration - fade_duration, 0):.3f}:d={fade_duration}')
+        
+        delay_ms = int(current_time * 1000)
+        filters.append(f'adelay=delays={delay_ms}:all=1')
+        filter_parts.append(f'[{i + input_offset}]{",".join(filters)}[a{i}]')
+        stream_refs.append(f'[a{i}]')
+        
+        # Next song starts fade_duration before this one ends, plus any silence gap
+        current_time += duration - fade_duration + silence_duration
+    
+    # Mix all streams together with volume normalization
+    filter_parts.append(f'{"".join(stream_refs)}amix=inputs={len(stream_refs)}:duration=longest:normalize=0[mixed]')
+    filter_parts.append(f'[mixed]{LOUDNORM_FILTER}[out]')
+    
+    return ';'.join(filter_parts)
+
+def stitch_audio_files(playlist_title, input_folder="songs", output_file=None, fade_duration=5, silence_duration=0, producer_tag=None, audio_codec_args=None, threads=None):
     """
     Stitch together all audio files from a folder with fade transitions using FFmpeg
     
@@ -113,58 +226,64 @@ def stitch_audio_files(playlist_title, input_folder="songs", output_file=None, f
         fade_duration: Fade duration in seconds (default 5)
         silence_duration: Silence duration after each fade out in seconds (default 0)
         producer_tag: Path to audio file to be added at the beginning (default None)
+        audio_codec_args: FFmpeg encoder arguments (default MP3_VBR_ARGS, use MP3_320K_ARGS for 320k CBR)
+        threads: FFmpeg thread count (default all cores but one, lower it when running several stitches at once)
     """
     
+    codec_args = audio_codec_args or MP3_VBR_ARGS
+    
     # Check if input folder exists
     if not os.path.exists(input_folder):
         print(f"❌ Folder '{input_folder}' not found!")
         return None
     
     # Check if ffmpeg is available
-    try:
-        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("❌ FFmpeg not found! Please install ffmpeg:")
-        print("  macOS: brew install ffmpeg")
-        print("  Ubuntu: sudo apt install ffmpeg")
-        print("  Windows: Download from https://ffmpeg.org/")
+    if not FFMPEG:
+        print_ffmpeg_missing()
         return None
     
-    # Find all audio files in the folder
-    audio_extensions = ['*.mp3', '*.wav', '*.m4a', '*.flac', '*.aac']
-    audio_files = []
-    
-    for extension in audio_extensions:
-        pattern = os.path.join(input_folder, extension)
-        audio_files.extend(glob.glob(pattern))
+    # Find all audio files in the folder (one directory pass for every extension)
+    with os.scandir(input_folder) as entries:
+        audio_files = [
+            entry.path for entry in entries
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in AUDIO_EXTENSIONS
+        ]
+    audio_files.sort()
     
     if not audio_files:
         print(f"❌ No audio files found in '{input_folder}'!")
         return None
     
-    # Sort files alphabetically for consistent order
-    audio_files.sort()
-    
     # Validate producer tag if provided
     if producer_tag and not os.path.exists(producer_tag):
         print(f"❌ Producer tag file '{producer_tag}' not found!")
         return None
     
     # Calculate timestamps for each song
-    timestamps = calculate_timestamps(audio_files, fade_duration, silence_duration, producer_tag)
+    # Probe every input once, the timestamps and the filter graphs all read from this
+    durations = get_audio_durations(([producer_tag] if producer_tag else []) + audio_files)
+    timestamps, total_duration = calculate_timestamps(audio_files, fade_duration, silence_duration, producer_tag, durations)
     
     if producer_tag:
-        print(f"🏷️  Producer tag: {os.path.basename(producer_tag)} ({get_audio_duration(producer_tag):.1f}s)")
-    print(f"🎵 Found {len(audio_files)} audio files:")
+        print(f"🏷️  Producer tag: {os.path.basename(producer_tag)} ({durations[producer_tag]:.1f}s)")
     
-    # Show producer tag first if it exists, then songs
+    # Format the file listing and the tracklist in one pass (producer tag first if it exists, then songs)
+    listing_lines = []
+    tracklist_lines = []
     song_counter = 1
-    for i, ts in enumerate(timestamps):
+    for ts in timestamps:
+        timestamp_str = format_timestamp(ts['start_time'])
         if ts['title'] == 'Producer Tag':
-            print(f"  Tag. {os.path.basename(ts['file'])} ({ts['duration']:.1f}s)")
+            listing_lines.append(f"  Tag. {os.path.basename(ts['file'])} ({ts['duration']:.1f}s)")
+            tracklist_lines.append(f"{timestamp_str} - Producer Tag")
         else:
-            print(f"  {song_counter}. {os.path.basename(ts['file'])} ({ts['duration']:.1f}s)")
+            listing_lines.append(f"  {song_counter}. {os.path.basename(ts['file'])} ({ts['duration']:.1f}s)")
+            tracklist_lines.append(f"{timestamp_str} - {song_counter:02d}. {ts['title']}")
             song_counter += 1
+    tracklist_text = "\n".join(tracklist_lines) + "\n"
+    
+    # One write per block keeps the listing together when several playlists run at once
+    sys.stdout.write(f"🎵 Found {len(audio_files)} audio files:\n" + "\n".join(listing_lines) + "\n")
     
     # Generate output filename if not provided
     if output_file is None:
@@ -176,311 +295,104 @@ def stitch_audio_files(playlist_title, input_folder="songs", output_file=None, f
     else:
         print(f"\n🔧 Stitching with {fade_duration}s crossfade transitions...")
     
-    try:
-        # Create temporary file list for ffmpeg concat
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
-            concat_file = f.name
-            for audio_file in audio_files:
-                # Use absolute path to avoid issues
-                abs_path = os.path.abspath(audio_file)
-                f.write(f"file '{abs_path}'\n")
-        
-        # Build ffmpeg command with crossfade filter and optional silence
-        # Prepare input files list (producer tag first if exists, then audio files)
-        all_inputs = []
-        input_files = []
-        
-        if producer_tag:
-            all_inputs.extend(['-i', producer_tag])
-            input_files.append(producer_tag)
-        
-        for audio_file in audio_files:
-            all_inputs.extend(['-i', audio_file])
-            input_files.append(audio_file)
-        
-        if len(audio_files) == 1:
-            # Single file, with optional producer tag
-            if producer_tag:
-                if silence_duration > 0:
-                    # Producer tag + single song + silence
-                    cmd = [
-                        'ffmpeg'
-                    ] + all_inputs + [
-                        '-filter_complex', f'[0][1]concat=n=2:v=0:a=1[joined];[joined]apad=pad_dur={silence_duration}[out]',
-                        '-map', '[out]', '-c:a', 'mp3', '-b:a', '320k',
-                        '-y', output_file
-                    ]
-                else:
-                    # Producer tag + single song
-                    cmd = [
-                        'ffmpeg'
-                    ] + all_inputs + [
-                        '-filter_complex', '[0][1]concat=n=2:v=0:a=1[out]',
-                        '-map', '[out]', '-c:a', 'mp3', '-b:a', '320k',
-                        '-y', output_file
-                    ]
-            else:
-                # Single file only (original logic)
-                if silence_duration > 0:
-                    cmd = [
-                        'ffmpeg', '-i', audio_files[0],
-                        '-filter_complex', f'[0]apad=pad_dur={silence_duration}[out]',
-                        '-map', '[out]', '-c:a', 'mp3', '-b:a', '320k',
-                        '-y', output_file
-                    ]
-                else:
-                    cmd = [
-                        'ffmpeg', '-i', audio_files[0], '-c:a', 'mp3', '-b:a', '320k',
-                        '-y', output_file
-                    ]
-        elif len(audio_files) == 2:
-            # Two files, crossfade with optional silence and producer tag
-            if producer_tag:
-                if silence_duration > 0:
-                    # Producer tag + 2 songs with crossfade and silence
-                    producer_duration = get_audio_duration(producer_tag)
-                    song1_delay = producer_duration
-                    song2_delay = producer_duration + get_audio_duration(audio_files[0]) - fade_duration + silence_duration
-                    
-                    cmd = [
-                        'ffmpeg'
-                    ] + all_inputs + [
-                        '-filter_complex',
-                        f'[1]apad=pad_dur={silence_duration}[s1];[s1]adelay={int(song1_delay * 1000)}|{int(song1_delay * 1000)}[a1];[2]adelay={int(song2_delay * 1000)}|{int(song2_delay * 1000)}[a2];[0][a1][a2]amix=inputs=3:duration=longest:normalize=0[mixed];[mixed]dynaudnorm[out]',
-                        '-map', '[out]', '-c:a', 'mp3', '-b:a', '320k',
-                        '-y', output_file
-                    ]
-                else:
-                    # Producer tag + 2 songs with crossfade
-                    producer_duration = get_audio_duration(producer_tag)
-                    song1_delay = producer_duration
-                    song2_delay = producer_duration + get_audio_duration(audio_files[0]) - fade_duration
-                    
-                    cmd = [
-                        'ffmpeg'
-                    ] + all_inputs + [
-                        '-filter_complex',
-                        f'[1]adelay={int(song1_delay * 1000)}|{int(song1_delay * 1000)}[a1];[2]adelay={int(song2_delay * 1000)}|{int(song2_delay * 1000)}[a2];[0][a1][a2]amix=inputs=3:duration=longest:normalize=0[mixed];[mixed]dynaudnorm[out]',
-                        '-map', '[out]', '-c:a', 'mp3', '-b:a', '320k',
-                        '-y', output_file
-                    ]
-            else:
-                # Two files only (original logic)
-                if silence_duration > 0:
-                    cmd = [
-                        'ffmpeg',
-                        '-i', audio_files[0],
-                        '-i', audio_files[1],
-                        '-filter_complex',
-                        f'[0]apad=pad_dur={silence_duration}[a0];[1]adelay={int((get_audio_duration(audio_files[0]) - fade_duration + silence_duration) * 1000)}|{int((get_audio_duration(audio_files[0]) - fade_duration + silence_duration) * 1000)}[a1];[a0][a1]amix=inputs=2:duration=longest:normalize=0[mixed];[mixed]dynaudnorm[out]',
-                        '-map', '[out]', '-c:a', 'mp3', '-b:a', '320k',
-                        '-y', output_file
-                    ]
-                else:
-                    cmd = [
-                        'ffmpeg',
-                        '-i', audio_files[0],
-                        '-i', audio_files[1],
-                        '-filter_complex',
-                        f'[0][1]acrossfade=d={fade_duration}',
-                        '-c:a', 'mp3', '-b:a', '320k',
-                        '-y', output_file
-                    ]
-        else:
-            # Multiple files, chain crossfades with silence and optional producer tag
-            filter_complex = ""
+    # The concat list lives in a temp dir that is removed however the stitch ends
+    with tempfile.TemporaryDirectory() as temp_dir:
+        try:
+            # Build ffmpeg command with crossfade filter and optional silence
+            # Prepare input files list (producer tag first if exists, then audio files)
+            all_inputs = []
+            input_files = []
             
             if producer_tag:
-                # With producer tag: more complex mixing
-                if silence_duration > 0:
-                    # Producer tag + multiple songs with crossfades and silence
-                    current_time = get_audio_duration(producer_tag)
-                    filter_parts = []
-                    
-                    # First audio file starts after producer tag
-                    for i, audio_file in enumerate(audio_files):
-                        input_index = i + 1  # +1 because producer tag is input [0]
-                        duration = get_audio_duration(audio_file)
-                        
-                        if i == 0:
-                            # First song: add silence padding and delay
-                            delay_ms = int(current_time * 1000)
-                            filter_parts.append(f'[{input_index}]apad=pad_dur={silence_duration}[s{i}];[s{i}]adelay={delay_ms}|{delay_ms}[a{i}]')
-                            current_time += duration + silence_duration
-                        else:
-                            # Subsequent files: delay to start at right time (with fade overlap)
-                            delay_ms = int((current_time - fade_duration) * 1000)
-                            filter_parts.append(f'[{input_index}]adelay={delay_ms}|{delay_ms}[a{i}]')
-                            current_time += duration - fade_duration + silence_duration
-                    
-                    # Mix producer tag with all audio streams
-                    stream_refs = '[0]' + ''.join([f'[a{i}]' for i in range(len(audio_files))])
-                    total_inputs = len(audio_files) + 1
-                    filter_parts.append(f'{stream_refs}amix=inputs={total_inputs}:duration=longest:normalize=0[mixed]')
-                    filter_parts.append('[mixed]dynaudnorm[out]')
-                    
-                    filter_complex = ';'.join(filter_parts)
-                else:
-                    # Producer tag + multiple songs with crossfades (no silence)
-                    current_time = get_audio_duration(producer_tag)
-                    filter_parts = []
-                    
-                    for i, audio_file in enumerate(audio_files):
-                        input_index = i + 1  # +1 because producer tag is input [0]
-                        duration = get_audio_duration(audio_file)
-                        
-                        if i == 0:
-                            # First song: delay after producer tag
-                            delay_ms = int(current_time * 1000)
-                            filter_parts.append(f'[{input_index}]adelay={delay_ms}|{delay_ms}[a{i}]')
-                            current_time += duration
-                        else:
-                            # Subsequent files: delay with fade overlap
-                            delay_ms = int((current_time - fade_duration) * 1000)
-                            filter_parts.append(f'[{input_index}]adelay={delay_ms}|{delay_ms}[a{i}]')
-                            current_time += duration - fade_duration
-                    
-                    # Mix producer tag with all audio streams
-                    stream_refs = '[0]' + ''.join([f'[a{i}]' for i in range(len(audio_files))])
-                    total_inputs = len(audio_files) + 1
-                    filter_parts.append(f'{stream_refs}amix=inputs={total_inputs}:duration=longest:normalize=0[mixed]')
-                    filter_parts.append('[mixed]dynaudnorm[out]')
-                    
-                    filter_complex = ';'.join(filter_parts)
+                all_inputs.extend(['-i', producer_tag])
+                input_files.append(producer_tag)
+            
+            for audio_file in audio_files:
+                all_inputs.extend(['-i', audio_file])
+                input_files.append(audio_file)
+            
+            # Create temporary file list for ffmpeg concat
+            # Use absolute paths to avoid issues, quotes are escaped the way the concat demuxer expects
+            cwd = os.getcwd()
+            concat_lines = []
+            for input_file in input_files:
+                abs_path = input_file if os.path.isabs(input_file) else os.path.join(cwd, input_file)
+                concat_lines.append("file '" + abs_path.replace("'", "'\\''") + "'")
+            
+            concat_file = os.path.join(temp_dir, 'concat.txt')
+            with open(concat_file, 'wb') as f:
+                f.write(("\n".join(concat_lines) + "\n").encode('utf-8'))
+            
+            can_copy = fade_duration == 0 and silence_duration == 0 and all(f.lower().endswith('.mp3') for f in input_files)
+            if can_copy:
+                # Only safe when every file has the same sample rate and channel layout,
+                # a file that can't be probed counts as different
+                stream_infos = set(get_audio_stream_infos(input_files).values())
+                can_copy = None not in stream_infos and len(stream_infos) == 1
+            
+            if can_copy:
+                # Nothing to fade or pad: join the MP3 frames as they are, no decode or re-encode
+                print(f"⚡ All inputs are MP3 with no fades, copying streams without re-encoding")
+                cmd = [
+                    FFMPEG, '-f', 'concat', '-safe', '0', '-i', concat_file,
+                    '-c', 'copy',
+                    '-y', output_file
+                ]
+            else:
+                # Fade and delay every song to its start time, then mix everything in one pass
+                filter_complex = build_mix_filter(audio_files, durations, fade_duration, silence_duration, producer_tag)
                 
                 cmd = [
-                    'ffmpeg'
+                    FFMPEG
                 ] + all_inputs + [
                     '-filter_complex', filter_complex,
                     '-map', '[out]',
-                    '-c:a', 'mp3', '-b:a', '320k',
+                    *codec_args,
                     '-y', output_file
                 ]
-            else:
-                # No producer tag: original logic
-                # Load all inputs
-                inputs = []
-                for i, audio_file in enumerate(audio_files):
-                    inputs.extend(['-i', audio_file])
-                
-                if silence_duration > 0:
-                    # More complex filter chain with silence padding
-                    current_time = 0
-                    filter_parts = []
+            
+            # Spread filter graphs and the encoder over the cores, adelay/afade per input run in parallel.
+            # By default one core is left for the rest of the pipeline (the video encode, the terminal, ...)
+            thread_count = str(threads or max(2, (os.cpu_count() or 2) - 1))
+            cmd[1:1] = ['-filter_threads', thread_count, '-filter_complex_threads', thread_count]
+            cmd[-2:-2] = ['-threads', thread_count]
+            
+            print(f"🚀 Running FFmpeg command...")
+            
+            # Run ffmpeg command
+            returncode, stderr_tail = run_ffmpeg(cmd, total_duration, icon='🎧')
+            
+            if returncode == 0:
+                # Success! Show stats
+                if os.path.exists(output_file):
+                    file_size = os.path.getsize(output_file) / (1024 * 1024)  # Convert to MB
                     
-                    for i, audio_file in enumerate(audio_files):
-                        duration = get_audio_duration(audio_file)
-                        if i == 0:
-                            # First file: add silence padding
-                            filter_parts.append(f'[{i}]apad=pad_dur={silence_duration}[a{i}]')
-                            current_time = duration + silence_duration
-                        else:
-                            # Subsequent files: delay to start at right time
-                            delay_ms = int(current_time * 1000)
-                            filter_parts.append(f'[{i}]adelay={delay_ms}|{delay_ms}[a{i}]')
-                            current_time += duration - fade_duration + silence_duration
+                    print(f"✅ Successfully created stitched audio!")
+                    print(f"📁 File: {output_file}")
+                    print(f"⏱️  Total duration: {total_duration//60:.0f}m {total_duration%60:.0f}s")
+                    print(f"💾 File size: {file_size:.2f} MB")
+                    print(f"🎵 Tracks combined: {len(audio_files)}")
                     
-                    # Mix all streams together with volume normalization
-                    stream_refs = ''.join([f'[a{i}]' for i in range(len(audio_files))])
-                    filter_parts.append(f'{stream_refs}amix=inputs={len(audio_files)}:duration=longest:normalize=0[mixed]')
-                    filter_parts.append('[mixed]dynaudnorm[out]')
+                    # Print timestamp tracklist
+                    sys.stdout.write(f"\n📋 Tracklist with Timestamps:\n{'=' * 50}\n{tracklist_text}")
                     
-                    filter_complex = ';'.join(filter_parts)
+                    # Also save tracklist to a text file
+                    tracklist_file = tracklist_path(output_file)
+                    with open(tracklist_file, 'w') as f:
+                        f.write(f"Tracklist for: {output_file}\n")
+                        f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+                        f.write(tracklist_text)
+                    print(f"📝 Tracklist saved to: {tracklist_file}")
                     
-                    cmd = [
-                        'ffmpeg'
-                    ] + inputs + [
-                        '-filter_complex', filter_complex,
-                        '-map', '[out]',
-                        '-c:a', 'mp3', '-b:a', '320k',
-                        '-y', output_file
-                    ]
+                    return output_file
                 else:
-                    # Original crossfade logic without silence
-                    current_stream = "[0]"
-                    for i in range(1, len(audio_files)):
-                        if i == 1:
-                            filter_complex += f"{current_stream}[{i}]acrossfade=d={fade_duration}[cf{i}];"
-                            current_stream = f"[cf{i}]"
-                        else:
-                            filter_complex += f"{current_stream}[{i}]acrossfade=d={fade_duration}[cf{i}];"
-                            current_stream = f"[cf{i}]"
-                    
-                    # Remove trailing semicolon
-                    filter_complex = filter_complex.rstrip(';')
-                    
-                    cmd = [
-                        'ffmpeg'
-                    ] + inputs + [
-                        '-filter_complex', filter_complex,
-                        '-map', current_stream,
-                        '-c:a', 'mp3', '-b:a', '320k',
-                        '-y', output_file
-                    ]
-        
-        print(f"🚀 Running FFmpeg command...")
-        
-        # Run ffmpeg command
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            # Success! Show stats
-            if os.path.exists(output_file):
-                file_size = os.path.getsize(output_file) / (1024 * 1024)  # Convert to MB
-                total_duration = get_audio_duration(output_file)
-                
-                print(f"✅ Successfully created stitched audio!")
-                print(f"📁 File: {output_file}")
-                print(f"⏱️  Total duration: {total_duration//60:.0f}m {total_duration%60:.0f}s")
-                print(f"💾 File size: {file_size:.2f} MB")
-                print(f"🎵 Tracks combined: {len(audio_files)}")
-                
-                # Print timestamp tracklist
-                print(f"\n📋 Tracklist with Timestamps:")
-                print(f"=" * 50)
-                
-                song_counter = 1
-                for ts in timestamps:
-                    timestamp_str = format_timestamp(ts['start_time'])
-                    if ts['title'] == 'Producer Tag':
-                        print(f"{timestamp_str} - Producer Tag")
-                    else:
-                        print(f"{timestamp_str} - {song_counter:02d}. {ts['title']}")
-                        song_counter += 1
-                
-                # Also save tracklist to a text file
-                tracklist_file = output_file.replace('.mp3', '_tracklist.txt')
-                with open(tracklist_file, 'w') as f:
-                    f.write(f"Tracklist for: {output_file}\n")
-                    f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-                    
-                    song_counter = 1
-                    for ts in timestamps:
-                        timestamp_str = format_timestamp(ts['start_time'])
-                        if ts['title'] == 'Producer Tag':
-                            f.write(f"{timestamp_str} - Producer Tag\n")
-                        else:
-                            f.write(f"{timestamp_str} - {song_counter:02d}. {ts['title']}\n")
-                            song_counter += 1
-                print(f"📝 Tracklist saved to: {tracklist_file}")
-                
-                return output_file
+                    print("❌ Output file was not created")
+                    return None
             else:
-                print("❌ Output file was not created")
+                print(f"❌ FFmpeg error:")
+                print(f"stderr: {stderr_tail}")
                 return None
-        else:
-            print(f"❌ FFmpeg error:")
-            print(f"stdout: {result.stdout}")
-            print(f"stderr: {result.stderr}")
+                
+        except Exception as e:
+            print(f"❌ Error during processing: {e}")
             return None
-            
-    except Exception as e:
-        print(f"❌ Error during processing: {e}")
-        return None
-    
-    finally:
-        # Clean up temporary file
-        try:
-            os.unlink(concat_file)
-        except:
-            pass
\ No newline at end of file
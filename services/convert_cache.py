@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Remembers which videos were made from which audio/image versions, so re-runs can skip
+conversions whose inputs haven't changed.
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+
+# Lives next to where the scripts are run, like songs/ and videos/
+CACHE_DB = os.environ.get('CONVERT_CACHE_DB', 'convert_cache.sqlite3')
+
+def _connect():
+    # timeout so parallel playlist runs wait for each other's writes instead of failing
+    conn = sqlite3.connect(CACHE_DB, timeout=30)
+    # One row per output file, saying what it was last made from and with which settings
+    # (encoder, mux flags, ...). The table name changed when settings was added.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS video_conversions (
+            out TEXT PRIMARY KEY, audio TEXT, audio_mt INT, image TEXT, image_mt INT, settings TEXT
+        )
+    """)
+    return conn
+
+def _key(audio_path, image_path):
+    audio, image = os.path.abspath(audio_path), os.path.abspath(image_path)
+    return audio, os.stat(audio).st_mtime_ns, image, os.stat(image).st_mtime_ns
+
+def lookup(audio_path, image_path, output_path, settings=''):
+    """True if output_path was made from these exact audio and image files with these settings and still exists"""
+    out = os.path.abspath(output_path)
+    try:
+        key = _key(audio_path, image_path)
+        # closing() because the connection's own with-block only commits, it never closes
+        with closing(_connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT audio, audio_mt, image, image_mt, settings FROM video_conversions WHERE out = ?",
+                (out,)
+            ).fetchone()
+    except (OSError, sqlite3.Error):
+        return False
+    
+    return row == (*key, settings) and os.path.exists(out)
+
+def store(audio_path, image_path, output_path, settings=''):
+    """Record a finished conversion"""
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO video_conversions VALUES (?, ?, ?, ?, ?, ?)",
+                (os.path.abspath(output_path), *_key(audio_path, image_path), settings)
+            )
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️  Could not update convert cache: {e}")
@@ -1,39 +1,39 @@
 #!/usr/bin/env python3
 import re
 
-def load_and_clean_tracklist(tracklist_file):
-    """Load tracklist from a text file"""
+# Drops an 8-digit suffix (and anything after it) from song titles
+_TS_RE = re.compile(r"\s\d{8}.*")
+
+def _clean_tracklist_lines(lines):
+    """Turn "00:00 - 01. Song Title" lines into "00:00 01. Song Title", skipping header lines"""
+    timestamps = []
+    for line in lines:
+        line = line.strip()
+        # Format: "00:00 - 01. Song Title"
+        if ' - ' in line and ':' in line[:8]:
+            timestamp, title = line.split(' - ', 1)
+            timestamps.append(_TS_RE.sub("", f"{timestamp.strip()} {title.strip()}"))
+    return "\n".join(timestamps)
+
+def load_and_clean_tracklist(tracklist_file, tracklist_text=None):
+    """Load tracklist from a text file, or from tracklist_text when its contents were already read"""
+    if tracklist_text is not None:
+        return _clean_tracklist_lines(tracklist_text.splitlines())
     try:
         with open(tracklist_file, 'r') as f:
-            lines = f.readlines()
-        
-        # Skip header lines and extract timestamps
-        timestamps = []
-        for line in lines:
-            line = line.strip()
-            if ':' in line and '-' in line:
-                # Format: "00:00 - 01. Song Title"
-                parts = line.split(' - ', 1)
-                if len(parts) == 2:
-                    timestamp = parts[0].strip()
-                    title = parts[1].strip()
-                    timestamps.append(f"{timestamp} {title}")
-        
-        timestamps_cleaned = [re.sub(r"\s\d{8}.*", "", timestamp) for timestamp in timestamps]
-        timestamps_str = "\n".join(timestamps_cleaned)
-        
-        return timestamps_str
+            return _clean_tracklist_lines(f)
     except FileNotFoundError:
         print(f"❌ Tracklist file not found: {tracklist_file}")
-        return []
+        return ""
 
-def generate_description(description, tracklist_file, hashtags):
+def generate_description(description, tracklist_file, hashtags, tracklist_text=None):
     """
     Generate a complete video description
     
     Args:
         playlist_title: Title of the playlist to match
-        tracklist_file: Path to tracklist file (optional, will try to find automatically)
+        tracklist_file: Path to tracklist file
+        tracklist_text: Contents of the tracklist file if already read (tracklist_file isn't opened then)
         custom_description: Custom description to use instead of JSON data
     
     Returns:
@@ -41,7 +41,7 @@ def generate_description(description, tracklist_file, hashtags):
     """
 
     # Load timestamps if tracklist file exists
-    timestamps_desc = load_and_clean_tracklist(tracklist_file)
+    timestamps_desc = load_and_clean_tracklist(tracklist_file, tracklist_text)
     
     # Build final description
     final_description = f"""{description}
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Shared FFmpeg/FFprobe lookup and process running for the stitcher and the video converter
+"""
+
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+# Resolved once at import, None when the tool isn't on PATH
+FFMPEG = shutil.which('ffmpeg')
+FFPROBE = shutil.which('ffprobe')
+
+# Python opens fds non-inheritable already, so on POSIX the close-every-fd pass before exec is
+# skipped. Together with the absolute paths above that lets CPython use posix_spawn (no copy of
+# this process's address space). Windows keeps the default.
+CLOSE_FDS = sys.platform == 'win32'
+
+def print_ffmpeg_missing():
+    """Tell the user how to install ffmpeg"""
+    print("❌ FFmpeg not found! Please install ffmpeg:")
+    print("  macOS: brew install ffmpeg")
+    print("  Ubuntu: sudo apt install ffmpeg")
+    print("  Windows: Download from https://ffmpeg.org/")
+
+def run_probe(cmd):
+    """Run a short ffprobe command and capture its output"""
+    return subprocess.run(cmd, capture_output=True, text=True, close_fds=CLOSE_FDS)
+
+def run_ffmpeg(cmd, duration=0, icon='🎬'):
+    """
+    Run an ffmpeg command with a progress line, returns (returncode, last lines of stderr)
+
+    Progress comes from -progress on stdout and is refreshed at most once a second. stderr is
+    drained on a background thread into a small ring buffer, so a long encode can't fill the
+    pipe and stall ffmpeg and only the tail is kept around for error reporting.
+    """
+    cmd = cmd[:1] + ['-progress', 'pipe:1', '-nostats'] + cmd[1:]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, close_fds=CLOSE_FDS)
+
+    stderr_tail = deque(maxlen=20)
+    drain = threading.Thread(target=stderr_tail.extend, args=(process.stderr,), daemon=True)
+    drain.start()
+
+    start_time = last_print = time.monotonic()
+    printed = False
+    for line in process.stdout:
+        key, _, value = line.strip().partition('=')
+        # out_time_ms is reported in microseconds despite the name
+        if key != 'out_time_ms' or not value.isdigit() or duration <= 0:
+            continue
+        now = time.monotonic()
+        if now - last_print < 1.0:
+            continue
+        last_print = now
+        t = min(int(value) / 1_000_000, duration)
+        progress = t / duration * 100
+        progress_bar = "█" * int(progress // 5) + "░" * (20 - int(progress // 5))
+        print(f"\r{icon} Progress: [{progress_bar}] {progress:.1f}% ({int(t // 60)}:{int(t % 60):02d}/{int(duration // 60)}:{int(duration % 60):02d}) - {now - start_time:.1f}s elapsed", end='', flush=True)
+        printed = True
+
+    process.wait()
+    drain.join()
+    if printed:
+        print()
+    return process.returncode, ''.join(stderr_tail)
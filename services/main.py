@@ -1,54 +1,92 @@
-from stability_api import stability_lofi_generation
-from musicgpt_api import musicgpt_lofi_generation
-from audio_stitcher import stitch_audio_files
+from stability_api import stability_batch_generation
+from musicgpt_api import musicgpt_batch_generation
+from audio_stitcher import stitch_audio_files, tracklist_path
 from mp3_to_mp4 import convert_audio_to_video
 from description_generator import generate_description
 from rename_songs import rename_songs
-import json
-import random
+from playlist_loader import load_playlists
+import os
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 HASHTAGS = """#backgroundmusicwithoutlimitations #coffeetime #coffeebreak #coffeeshopmusic #cafemusic #lofimusic #chillmusic #chillhop #lofihiphop #relaxingmusic #naturemusic #lofimusicforsleep #musicforsleep #studymusic #retromusic #lofichill #retrolofi #funk #funkopop #relaxation #relaxmusic #lofiremix #backgroundmusicforsleep #lofiforstudy"""
 
-def main(index):
+# Default prompts for the generation APIs
+MUSICGPT_PROMPT = "A slightly upbeat lofi hip hop instrumental with a warm, cozy, and cheerful mood, slow tempo, simple melody, bright but soothing."
+STABILITY_PROMPT = "A slightly upbeat lofi hip hop instrumental at ~88 BPM, with a warm, cozy, and cheerful mood (uplifting yet relaxed). Featuring jazzy piano, soft vinyl crackle, gentle acoustic guitar plucks, mellow laid-back drums with light swing, smooth jazzy bass, and ambient background texture — bright but soothing."
+
+def default_playlist_path():
+    """lofi_playlist_data.json in the repo root, or LOFI_PLAYLIST_JSON if set"""
+    return os.environ.get('LOFI_PLAYLIST_JSON', Path(__file__).resolve().parent.parent / 'lofi_playlist_data.json')
+
+def main(index, songs_folder="songs", threads=None, *, playlist_path=None, generators=(), generate_from=0,
+         rename=True, rename_only=False, prompt=None, music_style='Lofi'):
+    """
+    Build one playlist: optionally generate songs, match names, stitch, make the video and description
+    
+    Args:
+        index: Index of the playlist in the playlist JSON
+        songs_folder: Folder holding the playlist's songs
+        threads: FFmpeg thread count (main_many splits the cores between playlists)
+        playlist_path: Playlist JSON file (default lofi_playlist_data.json, see default_playlist_path)
+        generators: Song generators to run first, any of 'musicgpt' and 'stability'
+        generate_from: Index of the first song to generate, the ones before it are already in songs_folder
+        rename: Rename the songs in songs_folder to the playlist's song names (for songs added by hand)
+        rename_only: Stop after renaming
+        prompt: Prompt for the generators (default MUSICGPT_PROMPT / STABILITY_PROMPT)
+        music_style: MusicGPT music style
+    """
     print("🎵 Reading JSON Data for Lofi Plalists")
     print("Make sure to set the index of the playlist you want")
     print("=" * 60)
     print()
 
     # Setup lofi json data
-    with open('/Users/jordanpatel/Git/lofi-channel/lofi_playlist_data.json', 'r') as f:
-        lofi_playlist_data = json.load(f)
+    lofi_playlist_data = load_playlists(playlist_path or default_playlist_path())
 
     playlist_data = lofi_playlist_data[index] # set index to what playlist you want
     song_names = playlist_data['song_names'][:30]
+
+    # Output folders, the stitched mp3 and tracklist stay in playlists/
+    videos_dir = Path('videos')
+    descriptions_dir = Path('descriptions')
+    videos_dir.mkdir(exist_ok=True)
+    descriptions_dir.mkdir(exist_ok=True)
         
-    ### MusicGPT Call - Deprecated showing for contextg    
-    # for i in range(0, len(song_names), 2):
-    #     musicgpt_lofi_generation(
-    #         # prompt='Create a chill lofi hip hop beat with jazzy piano chords, soft vinyl crackle, and a relaxing atmosphere perfect for studying',
-    #         prompt=f"A slightly upbeat lofi hip hop instrumental with a warm, cozy, and cheerful mood, slow tempo, simple melody, bright but soothing.",
-    #         # prompt="A lo-fi instrumental which could suit walking outside in nature in the morning"
-    #         music_style='Lofi',
-    #         song_names = [playlist_data['song_names'][i], playlist_data['song_names'][i+1]]
-    #     )
+    # Songs to generate, out of the same (capped) list the rename and stitch use
+    songs_to_generate = song_names[generate_from:]
+    if generators:
+        Path(songs_folder).mkdir(parents=True, exist_ok=True)
     
-    ### Stability API Call - Deprecated showing for context     
-    # print("🎵 Stability AI Stable Audio 2.0 - Official API")
-    # print("🎵 ...Logic for Music GPT comming soon")
-    # print("=" * 60)
-    # print()
-
-    # # Stability Call    
-    # for song in playlist_data['song_names']:
-    #     stability_lofi_generation(
-    #         song_name=song,
-    #         prompt=f"A slightly upbeat lofi hip hop instrumental at ~88 BPM, with a warm, cozy, and cheerful mood (uplifting yet relaxed). Featuring jazzy piano, soft vinyl crackle, gentle acoustic guitar plucks, mellow laid-back drums with light swing, smooth jazzy bass, and ambient background texture — bright but soothing.",
-    #         duration=random.randint(int(150), int(190)) # random time intervals, stable caps at 190 for longest song
-    #     ) 
+    ### MusicGPT Call, generates two songs per request so the names go in pairs (an odd last name on its own)
+    if 'musicgpt' in generators:
+        musicgpt_batch_generation(
+            prompt=prompt or MUSICGPT_PROMPT,
+            music_style=music_style,
+            song_name_pairs=[songs_to_generate[i:i + 2] for i in range(0, len(songs_to_generate), 2)],
+            songs_folder=songs_folder
+        )
+    
+    ### Stability Call, several generations run at once under the API rate limit
+    if 'stability' in generators:
+        print("🎵 Stability AI Stable Audio 2.0 - Official API")
+        print("=" * 60)
+        print()
+        stability_batch_generation(
+            song_names=songs_to_generate,
+            prompt=prompt or STABILITY_PROMPT,
+            min_duration=150,
+            max_duration=190,  # random time intervals, stable caps at 190 for longest song
+            songs_folder=songs_folder
+        )
         
     # Instead of using musicgpt or stability (poor audio quality), can use suno and manually (no api atm) move files to song folder, run below command to match the titles
     # to json for stitcher to work
-    rename_songs(song_names)
+    if rename or rename_only:
+        rename_songs(song_names, songs_folder)
+    if rename_only:
+        return None
     
 
     # Call stitcher
@@ -58,28 +96,54 @@ def main(index):
     # Run the stitching process
     result_mp3 = stitch_audio_files(
         playlist_title=playlist_data['title'],
-        input_folder="songs",
+        input_folder=songs_folder,
         fade_duration=5,  # 5 seconds crossfade
         silence_duration=6,  # 8 seconds of silence after each fade
-        producer_tag=''
+        producer_tag='',
+        threads=threads
     )
     
     if result_mp3:
         print(f"\n🎉 Audio stitching complete!")
     else:
         print("\n❌ Audio stitching failed!")
+        return None
 
-    # Call mp3_to_mp4
+    # Call mp3_to_mp4 and the description generator together, both only need the stitched mp3
     print("🎬 MP3 to MP4 Converter")
     print("=" * 40)
 
+    mp3_path = Path(result_mp3)
+    mp4_path = videos_dir / f"{mp3_path.stem}.mp4"
+    description_path = descriptions_dir / f"{mp3_path.stem}_description.txt"
 
-    # Convert audio to video
-    result_mp4 = convert_audio_to_video(
-        audio_file=result_mp3,
-        image_file=None,
-        output_file=result_mp3.replace(".mp3", ".mp4")
-    )
+    # Read the tracklist the stitcher just wrote once, up front
+    tracklist_file = tracklist_path(result_mp3)
+    try:
+        tracklist_text = Path(tracklist_file).read_text(encoding='utf-8')
+    except FileNotFoundError:
+        print(f"❌ Tracklist file not found: {tracklist_file}")
+        tracklist_text = ''
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        # Convert audio to video
+        video_future = executor.submit(
+            convert_audio_to_video,
+            audio_file=result_mp3,
+            image_file=None,
+            output_file=mp4_path,
+            threads=threads
+        )
+        # Call description generator
+        description_future = executor.submit(
+            generate_description,
+            playlist_data['description'],
+            tracklist_file,
+            HASHTAGS,
+            tracklist_text=tracklist_text
+        )
+        result_mp4 = video_future.result()
+        description = description_future.result()
 
     if result_mp4:
         print(f"\n🎉 Conversion complete!")
@@ -87,20 +151,56 @@ def main(index):
     else:
         print("\n❌ Conversion failed!")
         
-    # Call description generator and save
-    description = generate_description(
-        playlist_data['description'],
-        result_mp3.replace(".mp3", "_tracklist.txt"),
-        HASHTAGS
-    )
-    with open(result_mp4.replace(".mp4", "_description.txt"), 'w', encoding='utf-8') as f:
-        f.write(description)
+    # Save description, written to a temp file and renamed so an interrupted run never leaves half a file
+    tmp_path = description_path.with_name(description_path.name + ".tmp")
+    tmp_path.write_bytes(description.encode('utf-8'))
+    os.replace(tmp_path, description_path)
     
     print("\n📋 Generated Description:")
     print("=" * 50)
+    print(f"📝 Description saved as: {description_path}")
     print(f"\n🎉 Everythign is complete! 🎉")
+    return result_mp4
+
+    
 
+def main_many(indices, workers=None):
+    """
+    Build several playlists in parallel, one process per playlist
+    
+    Each playlist reads its songs from its own folder (songs/<index>) since renaming and
+    stitching both work on the whole folder. FFmpeg threads are split between the workers
+    so the jobs together use about one thread per core instead of oversubscribing.
+    """
+    cpu_count = os.cpu_count() or 1
+    workers = workers or max(1, cpu_count // 4)
+    threads = max(1, cpu_count // workers)
     
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(main, index, os.path.join("songs", str(index)), threads)
+            for index in indices
+        ]
+        for future in futures:
+            future.result()
+
         
 if __name__ == "__main__":
-    main(index=16)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build a playlist mix, video and description")
+    parser.add_argument('index', type=int, nargs='?', default=16, help="Playlist index in the playlist JSON")
+    parser.add_argument('--playlist-json', help="Playlist JSON file (default lofi_playlist_data.json or $LOFI_PLAYLIST_JSON)")
+    parser.add_argument('--songs-folder', default="songs")
+    parser.add_argument('--use-musicgpt', action='store_true', help="Generate the songs with MusicGPT first")
+    parser.add_argument('--use-stability', action='store_true', help="Generate the songs with Stability first")
+    parser.add_argument('--no-rename', action='store_true', help="Keep song filenames as they are")
+    parser.add_argument('--rename-only', action='store_true', help="Only rename the songs, don't build anything")
+    args = parser.parse_args()
+    
+    main(
+        index=args.index,
+        songs_folder=args.songs_folder,
+        playlist_path=args.playlist_json,
+        generators=tuple(name for name, on in (('musicgpt', args.use_musicgpt), ('stability', args.use_stability)) if on),
+        rename=not args.no_rename,
+        rename_only=args.rename_only
+    )
@@ -4,17 +4,154 @@ Script to combine an image from thumbnails folder with an MP3 from songs folder
 to create an MP4 video with the image as a static background.
 """
 
+import os
+import argparse
 import sys
+import json
+import functools
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from moviepy.editor import ImageClip, AudioFileClip, CompositeVideoClip
+import convert_cache
+from ffmpeg_runner import FFMPEG, FFPROBE, CLOSE_FDS, run_ffmpeg, run_probe, print_ffmpeg_missing
 
-def create_mp4_from_image_and_audio(image_path, audio_path, output_path):
+try:
+    from mutagen.mp3 import MP3  # optional, reads MP3 length from the header without a subprocess
+except ImportError:
+    MP3 = None
+
+try:
+    from PIL import Image  # optional, used to shrink thumbnails before encoding
+except ImportError:
+    Image = None
+
+# Audio codecs the MP4 container takes as-is, anything else is re-encoded to AAC
+MP4_COPY_AUDIO_CODECS = {'mp3', 'aac', 'alac'}
+
+# The M4A (ipod) muxer is stricter than MP4, it only takes these. MP3 audio is copied into an
+# .mp4 with the plain mp4 muxer instead, anything else is re-encoded to AAC (see create_m4a_with_cover)
+M4A_COPY_AUDIO_CODECS = {'aac', 'alac'}
+
+# Size thumbnails are shrunk to before encoding
+VIDEO_SIZE = (1920, 1080)
+
+# Frame rate of the still-image video, every frame is the same so this is kept as low as players allow
+VIDEO_FPS = 1
+
+# Fixed parts of the video command, built once; only paths, threads and codecs change per call
+# Input options have to come before each -i: a PNG/JPEG and an MP3 need very little probing
+_INPUT_PROBE_ARGS = ('-analyzeduration', '100000', '-probesize', '100000')
+_IMAGE_INPUT_ARGS = (*_INPUT_PROBE_ARGS, '-loop', '1', '-framerate', str(VIDEO_FPS))
+_VIDEO_OUTPUT_ARGS = (
+    '-r', str(VIDEO_FPS),
+    '-g', '9999', '-keyint_min', '9999',  # one keyframe, every frame after it is the same image
+    '-vf', 'scale=trunc(iw/2)*2:trunc(ih/2)*2',  # yuv420p needs even dimensions
+    '-pix_fmt', 'yuv420p',
+)
+
+def probe_audio(audio_path):
+    """Get (codec name, duration in seconds) of the first audio stream, cached per file version"""
+    abs_path = os.path.abspath(audio_path)
+    return _probe_audio(abs_path, os.stat(abs_path).st_mtime_ns)
+
+@functools.lru_cache(maxsize=None)
+def _probe_audio(audio_path, mtime_ns):
+    """Read codec and duration, ffprobe unless mutagen can read it"""
+    if MP3 is not None and Path(audio_path).suffix.lower() == '.mp3':
+        try:
+            return 'mp3', MP3(os.fspath(audio_path)).info.length
+        except Exception:
+            pass  # not a readable MP3 after all, let ffprobe work it out
+    
+    if not FFPROBE:
+        return None, 0
+    cmd = [
+        FFPROBE, '-v', 'quiet', '-select_streams', 'a:0',
+        '-show_entries', 'stream=codec_name:format=duration',
+        '-of', 'json', os.fspath(audio_path)
+    ]
+    result = run_probe(cmd)
+    info = json.loads(result.stdout or '{}')
+    streams = info.get('streams') or [{}]
+    return streams[0].get('codec_name'), float(info.get('format', {}).get('duration', 0))
+
+# MP4 layout. faststart moves the index to the front with one extra pass over the finished file;
+# MP4_FRAGMENTED=1 writes a fragmented MP4 instead, playable right away with no rewrite pass.
+# Fragments are cut every 10s rather than on keyframes since the still image has only one.
+if os.environ.get('MP4_FRAGMENTED'):
+    MP4_MUX_ARGS = ['-movflags', 'empty_moov+default_base_moof', '-frag_duration', '10000000']
+else:
+    MP4_MUX_ARGS = ['-movflags', '+faststart']
+
+# libx264 settings, used when no hardware encoder is usable. Only a few frames get encoded, so
+# veryfast costs next to nothing over ultrafast and looks noticeably better (FFMPEG_PRESET overrides)
+X264_ARGS = [
+    '-c:v', 'libx264', '-tune', 'stillimage',
+    '-preset', os.environ.get('FFMPEG_PRESET', 'veryfast'), '-crf', '23',
+    '-x264-params', 'sliced-threads=1'  # split each frame across threads, there are few frames to spread
+]
+
+# Hardware H.264 encoders in order of preference, (encoder, platforms it is tried on, args)
+HW_ENCODERS = [
+    ('h264_videotoolbox', ('darwin',), ['-c:v', 'h264_videotoolbox', '-b:v', '2M', '-allow_sw', '1']),
+    ('h264_nvenc', ('linux', 'win32'), ['-c:v', 'h264_nvenc', '-preset', 'p1', '-tune', 'hq', '-rc', 'vbr', '-cq', '23']),
+    ('h264_qsv', ('linux', 'win32'), ['-c:v', 'h264_qsv', '-preset', 'veryfast', '-b:v', '2M']),
+]
+
+@functools.lru_cache(maxsize=None)
+def video_encoder_args(encoder=None):
     """
-    Create MP4 video from image and audio using MoviePy (much faster than FFmpeg)
+    Pick the video encoder once per process, a hardware encoder when one works, libx264 otherwise
+    
+    ffmpeg builds often list nvenc without a GPU to run it, so a candidate has to encode a
+    few test frames before it is used. Passing encoder (e.g. 'libx264', 'h264_nvenc') skips
+    the detection and uses that encoder.
+    """
+    if encoder == 'libx264':
+        return X264_ARGS
+    if encoder:
+        return next((args for name, _, args in HW_ENCODERS if name == encoder), ['-c:v', encoder])
+    
+    if not FFMPEG:
+        return X264_ARGS
+    try:
+        result = run_probe([FFMPEG, '-hide_banner', '-encoders'])
+    except OSError:
+        return X264_ARGS
+    
+    for encoder, platforms, args in HW_ENCODERS:
+        if encoder not in result.stdout or not sys.platform.startswith(platforms):
+            continue
+        test = subprocess.run(
+            [FFMPEG, '-hide_banner', '-v', 'error', '-f', 'lavfi', '-i', 'color=size=256x256:duration=1:rate=1',
+             '-pix_fmt', 'yuv420p', *args, '-f', 'null', '-'],
+            capture_output=True, close_fds=CLOSE_FDS
+        )
+        if test.returncode == 0:
+            print(f"⚡ Using hardware video encoder: {encoder}")
+            return args
+    
+    return X264_ARGS
+
+def mp4_audio_args(codec):
+    """Copy the audio when MP4 can hold the codec, otherwise encode it to AAC"""
+    if codec in MP4_COPY_AUDIO_CODECS:
+        print(f"🎵 Copying {codec} audio without re-encoding")
+        return ['-c:a', 'copy']
+    print(f"🎵 {codec} audio can't go in MP4 as-is, encoding to AAC")
+    return ['-c:a', 'aac', '-b:a', '192k']
+
+def create_mp4_from_image_and_audio(image_path, audio_path, output_path, threads=None, encoder=None):
+    """
+    Create MP4 video from image and audio with a single FFmpeg run
+    
+    The image is encoded as a 1 fps still-image stream and the audio is copied when MP4 can
+    hold it, so only a handful of frames are encoded however long the mix is. threads caps
+    the encoder and filter threads (default all cores), encoder forces a video encoder
+    (default detected by video_encoder_args).
     """
     try:
-        import time
-        
         # Validate input files
         if not image_path.exists():
             print(f"❌ Image file not found: {image_path}")
@@ -35,88 +172,246 @@ def create_mp4_from_image_and_audio(image_path, audio_path, output_path):
         print(f"  🖼️  Image: {image_path} ({image_path.stat().st_size / 1024:.1f} KB)")
         print(f"  🎵 Audio: {audio_path} ({audio_path.stat().st_size / 1024:.1f} KB)")
         
-        print("🎬 Starting video conversion with MoviePy...")
+        print("🎬 Starting video conversion with FFmpeg...")
         start_time = time.time()
         
-        # Load audio clip to get duration
-        print("🎵 Loading audio...")
-        audio_clip = AudioFileClip(str(audio_path))
-        duration = audio_clip.duration
-        
+        codec, duration = probe_audio(audio_path)
         minutes = int(duration // 60)
         seconds = int(duration % 60)
         print(f"📏 Audio duration: {minutes}m {seconds}s")
         
-        # Load image and set duration to match audio
-        print("🖼️  Loading image...")
-        image_clip = ImageClip(str(image_path), duration=duration)
-        
-        # Combine image and audio
-        print("🎬 Compositing video...")
-        video_clip = image_clip.set_audio(audio_clip)
-        
-        # Progress callback function
-        def progress_callback(get_frame, t):
-            progress = (t / duration) * 100 if duration > 0 else 0
-            elapsed = time.time() - start_time
-            if int(progress) % 5 == 0:  # Update every 5%
-                current_minutes = int(t // 60)
-                current_seconds = int(t % 60)
-                total_minutes = int(duration // 60)
-                total_seconds = int(duration % 60)
-                
-                progress_bar = "█" * int(progress // 5) + "░" * (20 - int(progress // 5))
-                print(f"\r🎬 Progress: [{progress_bar}] {progress:.1f}% ({current_minutes}:{current_seconds:02d}/{total_minutes}:{total_seconds:02d}) - {elapsed:.1f}s elapsed", end='', flush=True)
-            
-            return get_frame(t)
+        audio_args = mp4_audio_args(codec)
+        
+        thread_count = str(threads or os.cpu_count() or 2)
+        
+        cmd = [
+            FFMPEG,
+            '-filter_threads', thread_count,
+            '-hide_banner', '-loglevel', 'error',  # stderr is only kept for errors
+            *_IMAGE_INPUT_ARGS, '-i', os.fspath(image_path),
+            *_INPUT_PROBE_ARGS, '-i', os.fspath(audio_path),
+            '-map', '0:v:0', '-map', '1:a:0',  # skip cover art embedded in the audio file
+            *video_encoder_args(encoder),
+            *_VIDEO_OUTPUT_ARGS,
+            '-threads', thread_count,
+            *audio_args,
+            '-shortest',
+            *MP4_MUX_ARGS,
+            '-y', os.fspath(output_path)
+        ]
         
         # Write video file
         print("💾 Writing video file...")
-        video_clip.write_videofile(
-            str(output_path),
-            fps=1,  # Very low FPS since it's a static image
-            codec='libx264',
-            audio_codec='aac',
-            temp_audiofile='temp-audio.m4a',
-            remove_temp=True,
-            verbose=False,
-            logger=None  # Suppress moviepy's verbose output
-        )
-        
-        # Clean up clips
-        audio_clip.close()
-        image_clip.close()
-        video_clip.close()
+        returncode, stderr_tail = run_ffmpeg(cmd, duration)
+        if returncode != 0:
+            print(f"❌ FFmpeg error:")
+            print(f"stderr: {stderr_tail}")
+            return False
         
         elapsed_time = time.time() - start_time
         print(f"\n✅ Successfully created: {output_path}")
         print(f"⏱️  Total time: {elapsed_time:.1f}s")
         return True
         
-    except ImportError:
-        print("❌ Error: MoviePy not found. Installing...")
-        import subprocess
-        subprocess.run([sys.executable, "-m", "pip", "install", "moviepy"])
-        print("✅ MoviePy installed. Please run the script again.")
-        return False
     except Exception as e:
         print(f"❌ Error creating video: {e}")
         return False
 
+def create_m4a_with_cover(image_path, audio_path, output_path):
+    """
+    Create an M4A with the image attached as cover art, no video is encoded
+    
+    AAC/ALAC audio is copied with the M4A (ipod) muxer. MP3 in an .m4a is non-standard and some
+    players reject it, so MP3 audio is only copied when output_path isn't .m4a (then with the mp4
+    muxer). Anything else, including MP3 going into an .m4a, is encoded to AAC.
+    The image is stored as an attached picture, so with copied audio this takes about as long
+    as copying the file. Players and YouTube Music show the cover while it plays; use
+    create_mp4_from_image_and_audio when a real video stream is needed.
+    """
+    try:
+        start_time = time.time()
+        codec, duration = probe_audio(audio_path)
+        
+        if codec == 'mp3' and Path(output_path).suffix.lower() != '.m4a':
+            print(f"🎵 Copying mp3 audio without re-encoding")
+            audio_args = ['-c:a', 'copy', '-f', 'mp4']
+        elif codec in M4A_COPY_AUDIO_CODECS:
+            print(f"🎵 Copying {codec} audio without re-encoding")
+            audio_args = ['-c:a', 'copy', '-f', 'ipod']
+        else:
+            print(f"🎵 {codec} audio can't go in M4A as-is, encoding to AAC")
+            audio_args = ['-c:a', 'aac', '-b:a', '192k', '-f', 'ipod']
+        
+        cmd = [
+            FFMPEG,
+            '-hide_banner', '-loglevel', 'error',
+            '-i', os.fspath(image_path),
+            *_INPUT_PROBE_ARGS, '-i', os.fspath(audio_path),
+            '-map', '0:v:0', '-map', '1:a:0',
+            # MP4 cover art has to be JPEG or PNG, anything else is turned into a single JPEG frame
+            '-c:v', 'copy' if Path(image_path).suffix.lower() in ('.jpg', '.jpeg', '.png') else 'mjpeg',
+            *audio_args,
+            '-metadata:s:v', 'title=Album cover', '-metadata:s:v', 'comment=Cover (front)',
+            '-disposition:v', 'attached_pic',
+            '-movflags', '+faststart',  # cover art players expect a regular, non-fragmented file
+            '-y', os.fspath(output_path)
+        ]
+        
+        print("💾 Writing audio file with cover art...")
+        returncode, stderr_tail = run_ffmpeg(cmd, duration)
+        if returncode != 0:
+            print(f"❌ FFmpeg error:")
+            print(f"stderr: {stderr_tail}")
+            return False
+        
+        print(f"✅ Successfully created: {output_path}")
+        print(f"⏱️  Total time: {time.time() - start_time:.1f}s")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error creating audio with cover: {e}")
+        return False
+
+def create_mp4_batch(jobs, threads=None, encoder=None):
+    """
+    Create several MP4s with one FFmpeg run, jobs is a list of (image_path, audio_path, output_path)
+    
+    Every pair of inputs is mapped to its own output, so ffmpeg starts up and opens the encoder
+    once for the whole batch instead of once per song. Meant for short songs, where startup is
+    a large part of each conversion. Returns True if every output was written.
+    """
+    try:
+        start_time = time.time()
+        thread_count = str(threads or os.cpu_count() or 2)
+        video_args = video_encoder_args(encoder)
+        
+        cmd = [FFMPEG, '-filter_threads', thread_count, '-hide_banner', '-loglevel', 'error']
+        outputs = []
+        longest = 0
+        for i, (image_path, audio_path, output_path) in enumerate(jobs):
+            codec, duration = probe_audio(audio_path)
+            longest = max(longest, duration)
+            cmd += [*_IMAGE_INPUT_ARGS, '-i', os.fspath(image_path), *_INPUT_PROBE_ARGS, '-i', os.fspath(audio_path)]
+            outputs += [
+                '-map', f'{2 * i}:v:0', '-map', f'{2 * i + 1}:a:0',
+                *video_args,
+                *_VIDEO_OUTPUT_ARGS,
+                '-threads', thread_count,
+                *mp4_audio_args(codec),
+                '-shortest',
+                *MP4_MUX_ARGS,
+                '-y', os.fspath(output_path)
+            ]
+        cmd += outputs
+        
+        print(f"💾 Writing {len(jobs)} video files with one FFmpeg run...")
+        returncode, stderr_tail = run_ffmpeg(cmd, longest)
+        if returncode != 0:
+            print(f"❌ FFmpeg error:")
+            print(f"stderr: {stderr_tail}")
+            return False
+        
+        print(f"✅ Successfully created {len(jobs)} videos")
+        print(f"⏱️  Total time: {time.time() - start_time:.1f}s")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error creating videos: {e}")
+        return False
+
+def prepare_thumbnail(image_path):
+    """
+    Shrink an image to at most VIDEO_SIZE and save it as JPEG in a _cache folder next to it
+    
+    ffmpeg decodes the looped image for every frame, so a small JPEG is much cheaper than a 4K
+    PNG. The cached copy is keyed on the source file name (extension included, so foo.png and
+    foo.jpg don't share an entry) and mtime, and reused until the image changes, then the old
+    copy is removed when the new one is written.
+    Returns the original path when Pillow isn't installed or the image can't be read.
+    """
+    if Image is None:
+        return image_path
+    
+    cache_path = image_path.parent / '_cache' / f"{image_path.name}_{image_path.stat().st_mtime_ns}_{VIDEO_SIZE[1]}.jpg"
+    if cache_path.exists():
+        return cache_path
+    
+    try:
+        with Image.open(image_path) as im:
+            im = im.convert('RGB')
+            im.thumbnail(VIDEO_SIZE)
+            # yuv420p needs even dimensions
+            im = im.crop((0, 0, im.width - im.width % 2, im.height - im.height % 2))
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            im.save(cache_path, 'JPEG', quality=85, optimize=True)
+        print(f"🖼️  Cached resized thumbnail: {cache_path}")
+        _prune_thumbnail_cache(cache_path, image_path.name)
+        return cache_path
+    except Exception as e:
+        print(f"⚠️  Could not resize thumbnail, using original: {e}")
+        return image_path
+
+def _prune_thumbnail_cache(cache_path, source_name):
+    """Remove the cached copies of older versions of the same image, keeping cache_path"""
+    prefix, suffix = f"{source_name}_", f"_{VIDEO_SIZE[1]}.jpg"
+    with os.scandir(cache_path.parent) as entries:
+        for entry in entries:
+            name = entry.name
+            if (name != cache_path.name and name.startswith(prefix) and name.endswith(suffix)
+                    and name[len(prefix):-len(suffix)].isdigit()):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass  # another worker got to it first
+
+@functools.lru_cache(maxsize=8)
+def _scan_folder(folder_path, mtime_ns, extensions):
+    """One directory pass, cached until the folder's mtime changes (a file added or removed)"""
+    with os.scandir(folder_path) as entries:
+        files = [
+            Path(entry.path) for entry in entries
+            if entry.is_file() and Path(entry.name).suffix.lower() in extensions
+        ]
+    return tuple(sorted(files))
+
 def get_files_in_folder(folder_path, extensions):
-    """Get all files with specified extensions from a folder"""
-    folder = Path(folder_path)
-    if not folder.exists():
+    """Get all files with specified extensions ('png' or '.png') from a folder (case-insensitive)"""
+    try:
+        mtime_ns = os.stat(folder_path).st_mtime_ns
+    except FileNotFoundError:
         return []
     
-    files = []
-    for ext in extensions:
-        files.extend(folder.glob(f"*.{ext}"))
-        files.extend(folder.glob(f"*.{ext.upper()}"))
+    return list(_scan_folder(os.fspath(folder_path), mtime_ns, frozenset('.' + ext.lower().lstrip('.') for ext in extensions)))
+
+def conversion_settings(encoder=None, fast=False):
+    """The output settings a conversion depends on, part of the convert cache key"""
+    if fast:
+        return 'cover'
+    return ' '.join([*video_encoder_args(encoder), *_VIDEO_OUTPUT_ARGS, *MP4_MUX_ARGS])
+
+def find_matching_image(audio_path):
+    """Image in thumbnails/ named like the audio file, else the first image there, else None"""
+    thumbnails_folder = Path('thumbnails')
+    if not thumbnails_folder.exists():
+        return None
+    
+    # Look for image with same name as audio file, one folder scan indexed by name
+    # (when several extensions match, the earlier one in image_extensions wins)
+    image_extensions = ['.png', '.jpg', '.jpeg', '.bmp', '.tiff']
+    images = get_files_in_folder(thumbnails_folder, image_extensions)
+    
+    images_by_stem = {}
+    for image in sorted(images, key=lambda p: image_extensions.index(p.suffix.lower()), reverse=True):
+        images_by_stem[image.stem.lower()] = image
+    image_file = images_by_stem.get(Path(audio_path).stem.lower())
     
-    return sorted(files)
+    # If no matching image found, use the first available image
+    if image_file is None and images:
+        image_file = images[0]
+        print(f"🖼️ Using default image: {image_file}")
+    return image_file
 
-def convert_audio_to_video(audio_file, image_file=None, output_file=None):
+def convert_audio_to_video(audio_file, image_file=None, output_file=None, threads=None, encoder=None, fast=False):
     """
     Convert audio file to MP4 video with image background
     
@@ -124,37 +419,26 @@ def convert_audio_to_video(audio_file, image_file=None, output_file=None):
         audio_file: Path to the audio file
         image_file: Path to the image file (if None, looks for matching image)
         output_file: Output path for MP4 (if None, auto-generates)
+        threads: FFmpeg thread count (default all cores, lower it when running several conversions at once)
+        encoder: Video encoder to use, e.g. 'libx264' or 'h264_nvenc' (default hardware if available)
+        fast: Make an M4A with the image as cover art instead of encoding a video (see create_m4a_with_cover),
+              MP3 audio goes in an .mp4 instead so it can be copied
     
     Returns:
-        Path to created MP4 file or None if failed
+        Path to created MP4 (M4A with fast and non-MP3 audio) file or None if failed
     """
-    from pathlib import Path
-    
     audio_path = Path(audio_file)
     if not audio_path.exists():
         print(f"❌ Audio file not found: {audio_file}")
         return None
     
+    if not FFMPEG:
+        print_ffmpeg_missing()
+        return None
+    
     # Try to find matching image if not provided
     if image_file is None:
-        thumbnails_folder = Path('thumbnails')
-        if thumbnails_folder.exists():
-            # Look for image with same name as audio file
-            audio_stem = audio_path.stem
-            image_extensions = ['png', 'jpg', 'jpeg', 'bmp', 'tiff']
-            
-            for ext in image_extensions:
-                potential_path = thumbnails_folder / f"{audio_stem}.{ext}"
-                if potential_path.exists():
-                    image_file = potential_path
-                    break
-            
-            # If no matching image found, use the first available image
-            if image_file is None:
-                images = get_files_in_folder(thumbnails_folder, image_extensions)
-                if images:
-                    image_file = images[0]
-                    print(f"🖼️ Using default image: {image_file}")
+        image_file = find_matching_image(audio_path)
     
     if image_file is None:
         print("❌ No image file found")
@@ -169,23 +453,121 @@ def convert_audio_to_video(audio_file, image_file=None, output_file=None):
     if output_file is None:
         videos_folder = Path('videos')
         videos_folder.mkdir(parents=True, exist_ok=True)
-        output_file = videos_folder / f"{audio_path.stem}.mp4"
+        # Copied MP3 audio is only standard in an .mp4, the M4A muxer takes AAC/ALAC
+        suffix = 'm4a' if fast and probe_audio(audio_path)[0] != 'mp3' else 'mp4'
+        output_file = videos_folder / f"{audio_path.stem}.{suffix}"
     else:
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         output_file = output_path
     
+    # Nothing to do if this video was already made from the same audio and image
+    settings = conversion_settings(encoder, fast)
+    if convert_cache.lookup(audio_path, image_path, output_file, settings):
+        print(f"⏭️  Video is up to date, skipping conversion: {output_file}")
+        return str(output_file)
+    source_image_path = image_path
+    
+    image_path = prepare_thumbnail(image_path)
+    
     print(f"🎬 Creating video:")
     print(f"  🎵 Audio: {audio_path}")
     print(f"  🖼️  Image: {image_path}")
     print(f"  📹 Output: {output_file}")
     
     # Create the video
-    success = create_mp4_from_image_and_audio(image_path, audio_path, output_file)
+    if fast:
+        success = create_m4a_with_cover(image_path, audio_path, output_file)
+    else:
+        success = create_mp4_from_image_and_audio(image_path, audio_path, output_file, threads, encoder)
     
     if success:
+        convert_cache.store(audio_path, source_image_path, output_file, settings)
         print(f"✅ Video created successfully: {output_file}")
         return str(output_file)
     else:
         print("❌ Failed to create video")
         return None
+
+def main_batch(names, max_workers=None, songs_folder='songs', encoder=None, fast=False, one_ffmpeg=False):
+    """
+    Convert songs/<name>.mp3 for every name in parallel, one ffmpeg process per song
+    
+    Images are matched the same way as convert_audio_to_video (thumbnails/<name>.*). FFmpeg
+    threads are split between the workers so the jobs don't oversubscribe the cores.
+    one_ffmpeg makes all the videos with a single ffmpeg run instead (see create_mp4_batch).
+    Returns the number of videos that failed.
+    """
+    if one_ffmpeg and not fast:
+        return _main_batch_one_ffmpeg(names, songs_folder, encoder)
+    
+    cpu_count = os.cpu_count() or 2
+    max_workers = max_workers or max(1, cpu_count // 2)
+    threads = max(1, cpu_count // max_workers)
+    
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            name: executor.submit(convert_audio_to_video, Path(songs_folder) / f"{name}.mp3", None, None, threads, encoder, fast)
+            for name in names
+        }
+        failed = [name for name, future in futures.items() if not future.result()]
+    
+    print(f"🎉 {len(names) - len(failed)}/{len(names)} videos created")
+    for name in failed:
+        print(f"  ❌ {name}")
+    return len(failed)
+
+def _main_batch_one_ffmpeg(names, songs_folder, encoder):
+    """main_batch with every conversion that isn't up to date in one create_mp4_batch run"""
+    if not FFMPEG:
+        print_ffmpeg_missing()
+        return len(names)
+    
+    videos_folder = Path('videos')
+    videos_folder.mkdir(parents=True, exist_ok=True)
+    
+    settings = conversion_settings(encoder)
+    failed = []
+    jobs = []
+    for name in names:
+        audio_path = Path(songs_folder) / f"{name}.mp3"
+        image_path = find_matching_image(audio_path) if audio_path.exists() else None
+        if image_path is None:
+            print(f"❌ Missing audio or image for: {name}")
+            failed.append(name)
+            continue
+        output_path = videos_folder / f"{audio_path.stem}.mp4"
+        if convert_cache.lookup(audio_path, image_path, output_path, settings):
+            print(f"⏭️  Video is up to date, skipping conversion: {output_path}")
+            continue
+        jobs.append((name, image_path, audio_path, output_path))
+    
+    if jobs and create_mp4_batch([(prepare_thumbnail(image), audio, output) for _, image, audio, output in jobs], encoder=encoder):
+        for _, image_path, audio_path, output_path in jobs:
+            convert_cache.store(audio_path, image_path, output_path, settings)
+    else:
+        failed += [name for name, *_ in jobs]
+    
+    print(f"🎉 {len(names) - len(failed)}/{len(names)} videos created")
+    for name in failed:
+        print(f"  ❌ {name}")
+    return len(failed)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Make MP4 videos from audio files with a still image background")
+    parser.add_argument('audio_file', nargs='?', help="Audio file to convert")
+    parser.add_argument('image_file', nargs='?', help="Background image (default matching file in thumbnails/)")
+    parser.add_argument('--batch', metavar='NAMES_TXT', help="File with one song name per line, converts songs/<name>.mp3 in parallel")
+    parser.add_argument('--workers', type=int, help="Parallel conversions in batch mode (default half the cores)")
+    parser.add_argument('--encoder', help="Video encoder, e.g. libx264, h264_nvenc, h264_videotoolbox (default hardware if available)")
+    parser.add_argument('--fast', action='store_true', help="Write an M4A (MP4 for MP3 audio) with the image as cover art instead of encoding a video")
+    parser.add_argument('--one-ffmpeg', action='store_true', help="Batch mode: make every video with a single ffmpeg run (saves startup on short songs)")
+    args = parser.parse_args()
+    
+    if args.batch:
+        names = [line.strip() for line in Path(args.batch).read_text(encoding='utf-8').splitlines() if line.strip()]
+        sys.exit(1 if main_batch(names, args.workers, encoder=args.encoder, fast=args.fast, one_ffmpeg=args.one_ffmpeg) else 0)
+    elif args.audio_file:
+        sys.exit(0 if convert_audio_to_video(args.audio_file, args.image_file, encoder=args.encoder, fast=args.fast) else 1)
+    else:
+        parser.print_help()
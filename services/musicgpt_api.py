@@ -5,20 +5,51 @@ Generates lofi music using MusicGPT's AI music generation API
 """
 
 import os
+import re
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
 
-# load env file
-load_dotenv(dotenv_path=".env.local")
+try:
+    import orjson  # optional, faster than json for the responses parsed on every poll
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
+# load env file, unless the key is already in the environment (e.g. worker processes) or DOTENV_SKIP is set
+if not os.getenv("MUSICGPT_API_KEY") and not os.getenv("DOTENV_SKIP"):
+    load_dotenv(dotenv_path=".env.local")
+
+# Anything that isn't a letter, digit, underscore, space or dash is dropped from filenames
+_UNSAFE_FILENAME_RE = re.compile(r'[^\w \-]+')
+
+def _clean(name):
+    """Make a track name safe to use as a filename"""
+    return _UNSAFE_FILENAME_RE.sub('', name).rstrip().replace(' ', '_')
 
 class MusicGPTAPI:
     """MusicGPT API client with polling support"""
     
-    def __init__(self):
+    def __init__(self, songs_folder='songs'):
         self.api_key = os.getenv("MUSICGPT_API_KEY")
+        self.songs_folder = songs_folder  # where downloaded tracks are saved
         self.base_url = "https://api.musicgpt.com/api/public/v1"
+        
+        # Keep-alive session so the API call and both track downloads reuse connections
+        # (urllib3 only retries idempotent methods, so a failed POST is never resent)
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
+        ))
+        if self.api_key:
+            self.session.headers.update({"Authorization": f"Bearer {self.api_key}"})
     
     def generate_music(self, prompt=None, music_style=None, lyrics=None, 
                       make_instrumental=False, vocal_only=False, song_names=None):
@@ -31,15 +62,32 @@ class MusicGPTAPI:
             lyrics: Custom lyrics for the song
             make_instrumental: Generate instrumental-only track
             vocal_only: Generate vocals-only track
-            song_names: List of two strings to use as filenames for downloaded songs
+            song_names: List of one or two strings to use as filenames for downloaded songs
+                        (with one name only the first track is downloaded)
+        """
+        result = self.start_generation(prompt, music_style, lyrics, make_instrumental, vocal_only)
+        
+        # Use polling to get results
+        if result and result.get("task_id"):
+            return self.wait_for_task(result, song_names)
+        
+        # Return initial result if no task_id
+        return result
+    
+    def start_generation(self, prompt=None, music_style=None, lyrics=None,
+                         make_instrumental=False, vocal_only=False):
+        """
+        Submit a generation request without waiting for it to finish
+        
+        Returns the API response (with task_id and eta) or None if the request failed,
+        pass it to wait_for_task to download the tracks once they are ready
         """
         
         if not self.api_key:
             raise ValueError("API key not found! Set MUSICGPT_API_KEY environment variable")
         
-        # Prepare request
+        # Prepare request (Authorization is set on the session)
         headers = {
-            "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
         
@@ -74,16 +122,17 @@ class MusicGPTAPI:
             endpoint_url = f"{self.base_url}/MusicAI"
             print(f"🔍 Sending request to: {endpoint_url}")
             
-            response = requests.post(
+            response = self.session.post(
                 endpoint_url,
                 headers=headers,
-                json=payload
+                json=payload,
+                timeout=(5, 60)
             )
             
             print(f"📡 Response status: {response.status_code}")
             
             if response.status_code == 200:
-                result = response.json()
+                result = _loads(response.content)
                 
                 if result.get("success"):
                     task_id = result.get("task_id")
@@ -95,11 +144,6 @@ class MusicGPTAPI:
                     print(f"🎵 Track 1 ID: {result.get('conversion_id_1', 'N/A')}")
                     print(f"🎵 Track 2 ID: {result.get('conversion_id_2', 'N/A')}")
                     
-                    # Use polling to get results
-                    if task_id:
-                        return self.poll_for_result(task_id, eta, song_names)
-                    
-                    # Return initial result if no task_id
                     return result
                 
                 else:
@@ -121,26 +165,29 @@ class MusicGPTAPI:
         except requests.exceptions.RequestException as e:
             print(f"❌ Request error: {e}")
             return None
+        except ValueError as e:
+            print(f"❌ Invalid JSON response: {e}")
+            return None
     
+    def wait_for_task(self, generation, song_names=None):
+        """Block until a task from start_generation completes and download its tracks"""
+        eta = generation.get("eta", 180)  # Default 3 minutes if not provided
+        return self.poll_for_result(generation["task_id"], eta, song_names)
     
     def get_task_result(self, task_id):
         """Get task result by ID using the getById endpoint"""
         if not self.api_key:
             raise ValueError("API key not found!")
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         try:
-            response = requests.get(
-                f"{self.base_url}/byId?conversionType=MUSIC_AI&task_id={task_id}",
-                headers=headers
+            response = self.session.get(
+                f"{self.base_url}/byId",
+                params={"conversionType": "MUSIC_AI", "task_id": task_id},
+                timeout=(5, 60)
             )
             
             if response.status_code == 200:
-                return response.json()
+                return _loads(response.content)
             elif response.status_code == 404:
                 return {"error": "Task not found", "status_code": 404}
             else:
@@ -148,20 +195,33 @@ class MusicGPTAPI:
                 
         except requests.exceptions.RequestException as e:
             return {"error": f"Request failed: {e}"}
+        except ValueError as e:  # orjson and json both raise a ValueError subclass on a non-JSON body
+            return {"error": f"Invalid JSON response: {e}"}
     
-    def poll_for_result(self, task_id, eta_seconds, song_names=None):
-        """Poll for task completion using getById endpoint"""
-        print(f"🔄 Polling for task completion...")
-        print(f"⏱️  Initial wait: {eta_seconds + 20} seconds")
+    def poll_for_result(self, task_id, eta_seconds, song_names=None, timeout=600):
+        """
+        Poll for task completion using getById endpoint
         
-        # Wait for ETA + 20 seconds before first poll
-        time.sleep(eta_seconds + 20)
+        The first poll comes at half the ETA and the gaps grow from there (15s, 30s, 60s, then
+        every 90s), so early finishers are picked up quickly without hammering the API. Gives
+        up once timeout seconds have passed since polling started.
+        """
+        print(f"🔄 Polling for task completion...")
         
-        max_retries = 5
-        retry_delay = 30  # 30 seconds between retries
+        deadline = time.monotonic() + timeout
+        delays = iter([max(5, eta_seconds * 0.5), 15, 30, 60])
+        attempt = 0
         
-        for attempt in range(max_retries):
-            print(f"🔍 Polling attempt {attempt + 1}/{max_retries}")
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            delay = min(next(delays, 90), remaining)
+            print(f"⏸️  Waiting {delay:.0f} seconds before next attempt...")
+            time.sleep(delay)
+            
+            attempt += 1
+            print(f"🔍 Polling attempt {attempt}")
             
             result = self.get_task_result(task_id)
             
@@ -175,18 +235,13 @@ class MusicGPTAPI:
                     print(f"❌ Task failed: {conversion_data.get('message', 'Unknown error')}")
                     return result
                 elif conversion_data.get("status") in ["PENDING", "PROCESSING", "IN_PROGRESS"]:
-                    print(f"⏳ Task still processing... (attempt {attempt + 1}) - Status: {conversion_data.get('status')}")
+                    print(f"⏳ Task still processing... (attempt {attempt}) - Status: {conversion_data.get('status')}")
                 else:
                     print(f"🤔 Unexpected status: {conversion_data.get('status', 'unknown')}")
             else:
                 print(f"❌ Polling error: {result.get('error')}")
-            
-            # Wait before next retry (except on last attempt)
-            if attempt < max_retries - 1:
-                print(f"⏸️  Waiting {retry_delay} seconds before next attempt...")
-                time.sleep(retry_delay)
         
-        print(f"⏰ Maximum polling attempts reached")
+        print(f"⏰ Polling time budget of {timeout}s used up")
         return {"status": "timeout", "message": "Task did not complete within polling window"}
     
     def _process_polling_result(self, result_data, song_names=None):
@@ -195,22 +250,26 @@ class MusicGPTAPI:
             return result_data
         
         conversion_data = result_data.get('conversion', {})
-        downloaded_files = []
         
-        # Download music tracks from conversion_path fields
-        for i in [1, 2]:
-            conversion_path = conversion_data.get(f'conversion_path_{i}')
-            
-            # Use custom song name if provided, otherwise use API title or default
-            if song_names and len(song_names) >= i:
-                track_title = song_names[i-1]  # i-1 because list is 0-indexed
-            else:
-                track_title = conversion_data.get(f'title_{i}', f'track_{i}')
+        # Download the tracks from conversion_path fields concurrently (network bound),
+        # a generation makes two but only as many as there are song names are kept
+        track_count = min(len(song_names), 2) if song_names else 2
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            downloads = []
+            for i in range(1, track_count + 1):
+                conversion_path = conversion_data.get(f'conversion_path_{i}')
+                
+                # Use custom song name if provided, otherwise use API title or default
+                if song_names and len(song_names) >= i:
+                    track_title = song_names[i-1]  # i-1 because list is 0-indexed
+                else:
+                    track_title = conversion_data.get(f'title_{i}', f'track_{i}')
+                
+                if conversion_path:
+                    downloads.append(executor.submit(self._download_music, conversion_path, track_title, i))
             
-            if conversion_path:
-                filename = self._download_music(conversion_path, track_title, i)
-                if filename:
-                    downloaded_files.append(filename)
+            # Keep track order regardless of which download finishes first
+            downloaded_files = [filename for filename in (d.result() for d in downloads) if filename]
         
         result_data['downloaded_files'] = downloaded_files
         
@@ -231,36 +290,35 @@ class MusicGPTAPI:
         try:
             print(f"⬇️ Downloading {track_name} from {url}...")
             
-            response = requests.get(url)
-            response.raise_for_status()
-            
-            print(f"📦 Response status: {response.status_code}, Content length: {len(response.content)} bytes")
-            
             # Generate filename with track title
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             # Clean track name for filename
-            clean_track_name = "".join(c for c in track_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-            clean_track_name = clean_track_name.replace(' ', '_')
+            clean_track_name = _clean(track_name)
             
             if track_number:
                 filename = f"{clean_track_name}_{timestamp}_{track_number}.mp3"
             else:
                 filename = f"{clean_track_name}_{timestamp}_.mp3"
             
-            # Use absolute path in services directory
-            full_path = os.path.join('songs/', filename)
+            full_path = os.path.join(self.songs_folder, filename)
             
-            print(f"📁 Saving to: {full_path}")
-            
-            with open(full_path, 'wb') as f:
-                f.write(response.content)
+            # Stream straight to disk so the MP3 is never held in memory in full
+            # The files may live on another host, don't send it the API key
+            with self.session.get(url, headers={"Authorization": None}, stream=True, timeout=(5, 60)) as response:
+                response.raise_for_status()
+                
+                print(f"📦 Response status: {response.status_code}, Content length: {response.headers.get('Content-Length', 'unknown')} bytes")
+                print(f"📁 Saving to: {full_path}")
+                
+                with open(full_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=1 << 16):
+                        f.write(chunk)
             
             # Verify file was created
             if os.path.exists(full_path):
-                file_size = len(response.content) / (1024 * 1024)
-                actual_size = os.path.getsize(full_path) / (1024 * 1024)
+                file_size = os.path.getsize(full_path) / (1024 * 1024)
                 print(f"✅ Downloaded: {filename} ({file_size:.2f} MB)")
-                print(f"📂 File saved at: {full_path} ({actual_size:.2f} MB)")
+                print(f"📂 File saved at: {full_path}")
                 return full_path
             else:
                 print(f"❌ File was not created: {full_path}")
@@ -272,15 +330,16 @@ class MusicGPTAPI:
             print(f"🔍 Full traceback: {traceback.format_exc()}")
             return None
 
-def musicgpt_lofi_generation(prompt, music_style, song_names=None):
+def musicgpt_lofi_generation(prompt, music_style, song_names=None, songs_folder='songs'):
     """Test MusicGPT with lofi prompts
     
     Args:
-        song_names: List of two strings to use as filenames for the downloaded songs
+        song_names: List of one or two strings to use as filenames for the downloaded songs
                    Example: ['My_Lofi_Track_1', 'My_Lofi_Track_2']
+        songs_folder: Folder the songs are downloaded to
     """
     
-    api = MusicGPTAPI()
+    api = MusicGPTAPI(songs_folder)
     
     
     print("🎵 MusicGPT API Test - LoFi Generation")
@@ -291,7 +350,7 @@ def musicgpt_lofi_generation(prompt, music_style, song_names=None):
     # Test lofi generation
     print(f"🎯 Testing: Lofi Hip Hop Generation")
     if song_names:
-        print(f"🎼 Custom song names: {song_names[0]}, {song_names[1]}")
+        print(f"🎼 Custom song names: {', '.join(song_names)}")
     print("-" * 40)
     
     result = api.generate_music(
@@ -319,3 +378,49 @@ def musicgpt_lofi_generation(prompt, music_style, song_names=None):
         print("3. ✓ Check your network connection for API requests")
     
     return result
+
+def musicgpt_batch_generation(prompt, music_style, song_name_pairs, songs_folder='songs'):
+    """Submit every generation up front, then wait for all of them together
+    
+    Remote generation time overlaps across pairs, so K pairs take roughly as long as one
+    
+    Args:
+        song_name_pairs: List of [name_1, name_2] lists, one generation per pair
+                         (a [name] list keeps only the first track, for an odd song count)
+        songs_folder: Folder the songs are downloaded to
+    """
+    
+    api = MusicGPTAPI(songs_folder)
+    
+    print("🎵 MusicGPT API - Batch Generation")
+    print("=" * 60)
+    print(f"🎯 Submitting {len(song_name_pairs)} generations")
+    print("-" * 40)
+    
+    # Fire off all POSTs first, they only return a task_id and an ETA
+    pending = []
+    for song_names in song_name_pairs:
+        generation = api.start_generation(
+            prompt=prompt,
+            music_style=music_style,
+            make_instrumental=True
+        )
+        if generation and generation.get("task_id"):
+            pending.append((generation, song_names))
+        else:
+            print(f"❌ Could not start generation for {song_names}")
+    
+    if not pending:
+        return []
+    
+    # Wait on every task at once, polling is just sleeping so threads are enough. A capped pool
+    # would start each later wait's eta/2 sleep only once an earlier wait finished. A sleeping
+    # wait holds no connection, so this doesn't strain the session's pool either
+    with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+        waits = [executor.submit(api.wait_for_task, generation, song_names) for generation, song_names in pending]
+        results = [w.result() for w in waits]
+    
+    succeeded = sum(1 for result in results if result and result.get('success'))
+    print(f"🎉 {succeeded}/{len(song_name_pairs)} generations completed")
+    
+    return results
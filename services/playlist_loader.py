@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Shared loader for the playlist JSON files (lofi_playlist_data.json, dnb_playlist_data.json)
+"""
+
+import os
+import json
+import functools
+
+try:
+    import orjson  # optional, parses the playlist data several times faster than json
+except ImportError:
+    orjson = None
+
+@functools.lru_cache(maxsize=4)
+def _load(path, mtime_ns):
+    """Parse the playlist JSON, cached until the file's mtime changes"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def load_playlists(path):
+    """Load a playlist JSON file, repeated calls reuse the parsed data until the file is edited"""
+    path = os.fspath(path)
+    return _load(path, os.stat(path).st_mtime_ns)
@@ -5,9 +5,16 @@ Script to rename songs in the 'songs' folder using song names from lofi_playlist
 
 import os
 import json
-import glob
 
-def rename_songs(song_names):
+def _ignores_case(folder, names):
+    """True if folder is on a case-insensitive filesystem (macOS, Windows), probed with one of its own files"""
+    for name in names:
+        swapped = name.swapcase()
+        if swapped != name and swapped not in names:
+            return os.path.exists(os.path.join(folder, swapped))
+    return False
+
+def rename_songs(song_names, songs_folder='songs'):
     """Rename all MP3 files in songs folder using the song names"""
     # Get the song names from JSON
     
@@ -15,9 +22,19 @@ def rename_songs(song_names):
         print("Could not find song names for 'Rest under a tree and feel protected by nature' playlist")
         return
     
-    # Get all MP3 files in songs folder
-    songs_folder = 'songs'
-    mp3_files = sorted(glob.glob(os.path.join(songs_folder, '*.mp3')))
+    # Get all MP3 files in songs folder, the same directory pass tells us which names are taken
+    try:
+        with os.scandir(songs_folder) as entries:
+            mp3_entries = sorted((entry for entry in entries if entry.name.lower().endswith('.mp3')), key=lambda entry: entry.name)
+    except FileNotFoundError:
+        print(f"Found 0 MP3 files ('{songs_folder}' does not exist)")
+        return
+    mp3_files = [entry.path for entry in mp3_entries]
+    names = {entry.name for entry in mp3_entries}
+    # Where "Song.mp3" and "song.mp3" are one file, compare casefolded, otherwise exact names
+    # (the same answers os.path.exists would give)
+    key = str.casefold if _ignores_case(songs_folder, names) else str
+    existing = {key(name) for name in names}
     
     print(f"Found {len(mp3_files)} MP3 files")
     print(f"Found {len(song_names)} song names")
@@ -38,13 +55,15 @@ def rename_songs(song_names):
         new_file = os.path.join(songs_folder, new_filename)
         
         # Check if target already exists
-        if os.path.exists(new_file):
+        if key(new_filename) in existing:
             print(f"Skipping {old_filename} -> {new_filename} (target exists)")
             continue
         
         # Rename the file
         try:
             os.rename(old_file, new_file)
+            existing.discard(key(old_filename))
+            existing.add(key(new_filename))
             print(f"Renamed: {old_filename} -> {new_filename}")
         except Exception as e:
             print(f"Error renaming {old_filename}: {e}")
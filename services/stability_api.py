@@ -6,18 +6,62 @@ Based on the official API documentation from platform.stability.ai
 
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 from datetime import datetime
 import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
-# load env file
-load_dotenv(dotenv_path=".env.local")
+# load env file, unless the key is already in the environment (e.g. worker processes) or DOTENV_SKIP is set
+if not os.getenv("STABILITY_AUDIO_API_KEY") and not os.getenv("DOTENV_SKIP"):
+    load_dotenv(dotenv_path=".env.local")
+
+class TokenBucket:
+    """
+    Thread-safe token bucket, wait_for_token() blocks until a request may be sent
+    
+    Tokens refill at `rate` per second up to `max_tokens`, so short bursts are allowed while
+    the long-run request rate stays under the limit.
+    """
+    def __init__(self, rate, max_tokens):
+        self.rate = rate
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def wait_for_token(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.max_tokens, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
 
 class StabilityAudioAPI:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, songs_folder='songs'):
         self.api_key = os.getenv("STABILITY_AUDIO_API_KEY")
+        self.songs_folder = songs_folder  # where generated songs are saved
         self.endpoint = "https://api.stability.ai/v2beta/audio/stable-audio-2/text-to-audio"
+        
+        # Keep-alive session so repeated generations reuse the TLS connection
+        # (urllib3 only retries idempotent methods, so a failed POST is never resent)
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504])
+        ))
+        if self.api_key:
+            self.session.headers.update({"authorization": f"Bearer {self.api_key}"})
     
     def generate_audio(self, prompt, song_name, duration, model="stable-audio-2", output_format="mp3", 
                       steps=50, cfg_scale=7, seed=None):
@@ -38,8 +82,8 @@ class StabilityAudioAPI:
             raise ValueError("API key not found! Set STABILITY_API_KEY environment variable")
         
         # Prepare headers (DON'T set content-type - let requests handle multipart/form-data)
+        # authorization is set on the session
         headers = {
-            "authorization": f"Bearer {self.api_key}",
             "accept": "audio/*",  # Get audio bytes directly
             "stability-client-id": "lofi-channel-generator",
             "stability-client-version": "1.0.0"
@@ -67,17 +111,19 @@ class StabilityAudioAPI:
         
         try:
             # Send POST request with files for proper multipart/form-data
-            response = requests.post(
+            response = self.session.post(
                 self.endpoint,
                 headers=headers,
-                files=files  # This creates proper multipart/form-data with boundary
+                files=files,  # This creates proper multipart/form-data with boundary
+                stream=True,  # the audio is written to disk as it arrives
+                timeout=(5, 300)  # generation happens before the first byte comes back
             )
             
             print(f"📡 Response status: {response.status_code}")
             
             if response.status_code == 200:
                 # Success - got audio bytes
-                return self._save_audio(song_name, response.content, output_format)
+                return self._save_audio(song_name, response, output_format)
             
             elif response.status_code == 400:
                 print(f"❌ Invalid parameters: {response.text}")
@@ -107,17 +153,19 @@ class StabilityAudioAPI:
             print(f"❌ Request error: {e}")
             return None
     
-    def _save_audio(self, song_name, audio_data, format_ext):
-        """Save audio data to file"""
+    def _save_audio(self, song_name, response, format_ext):
+        """Stream the audio response body to a file"""
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"songs/{song_name}_{timestamp}.{format_ext}"
+            filename = os.path.join(self.songs_folder, f"{song_name}_{timestamp}.{format_ext}")
             
             with open(filename, 'wb') as f:
-                f.write(audio_data)
+                for chunk in response.iter_content(chunk_size=1 << 16):
+                    f.write(chunk)
             
-            file_size = len(audio_data) / (1024 * 1024)  # MB
-            duration_estimate = len(audio_data) / (44100 * 2 * 2)  # Rough estimate for stereo 16-bit
+            size_bytes = os.path.getsize(filename)
+            file_size = size_bytes / (1024 * 1024)  # MB
+            duration_estimate = size_bytes / (44100 * 2 * 2)  # Rough estimate for stereo 16-bit
             
             print(f"✅ Audio saved: {filename}")
             print(f"📁 File size: {file_size:.2f} MB")
@@ -129,10 +177,10 @@ class StabilityAudioAPI:
             print(f"❌ Error saving audio: {e}")
             return None
 
-def stability_lofi_generation(song_name, prompt, duration):
-    """Test lofi beat generation with various prompts"""
+def stability_lofi_generation(song_name, prompt, duration, api=None):
+    """Test lofi beat generation with various prompts (pass api to reuse its connections)"""
     
-    api = StabilityAudioAPI()
+    api = api or StabilityAudioAPI()
     
     print("🎵 Stability AI Official API - LoFi Beat Generator")
     print("=" * 60)
@@ -170,4 +218,35 @@ def stability_lofi_generation(song_name, prompt, duration):
     
     return generated_files
 
-
+def stability_batch_generation(song_names, prompt, min_duration=150, max_duration=190, max_workers=4, max_per_second=10, songs_folder='songs'):
+    """
+    Generate one song per name with several requests in flight at once
+    
+    Each call blocks for the whole remote generation, so running them on threads makes the
+    batch take about len(song_names) / max_workers generations instead of one after another.
+    A token bucket keeps the request rate under Stability's limit (150 requests per 10 seconds).
+    
+    Songs are saved to songs_folder. Returns the list of generated files
+    """
+    limiter = TokenBucket(rate=max_per_second, max_tokens=max_per_second)
+    api = StabilityAudioAPI(songs_folder=songs_folder)  # one session shared by every worker
+    
+    def generate(song_name):
+        limiter.wait_for_token()
+        try:
+            return stability_lofi_generation(
+                song_name=song_name,
+                prompt=prompt,
+                duration=random.randint(min_duration, max_duration),  # stable caps at 190 for longest song
+                api=api
+            )
+        except Exception as e:
+            print(f"❌ Generation failed for {song_name}: {e}")
+            return []
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(generate, song_names))
+    
+    generated_files = [filename for files in results for filename in files]
+    print(f"🎉 {len(generated_files)}/{len(song_names)} songs generated")
+    return generated_files